@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Compare BK-tree and brute-force nearest pronunciation search.
+
+Usage::
+
+    python benchmarks/nearest_speed.py ISLEdict.txt [--queries N] [-k K]
+"""
+
+from __future__ import print_function
+
+import argparse
+import random
+import time
+
+from islex.load import stream_from_fh
+from islex.nearest import PronNeighbors
+
+
+def perturb(phones, inventory, rng):
+    """Apply one random substitution, insertion or deletion."""
+    phones = list(phones)
+    i = rng.randrange(len(phones) + 1)
+    op = rng.choice(('sub', 'ins', 'del') if i < len(phones) else ('ins',))
+    if op == 'sub':
+        phones[i] = rng.choice(inventory)
+    elif op == 'ins':
+        phones.insert(i, rng.choice(inventory))
+    else:
+        del phones[i]
+    return tuple(phones)
+
+
+def timed(search, queries, k):
+    start = time.time()
+    results = [search(q, k=k) for q in queries]
+    return time.time() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('isle_file')
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('-k', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.isle_file, mode='rb') as fh:
+        words = list(stream_from_fh(fh))
+    start = time.time()
+    index = PronNeighbors(words)
+    print("built index over %d prons in %.2fs"
+          % (len(index), time.time() - start))
+
+    rng = random.Random(args.seed)
+    prons = [p.ipa for w in words for p in w.prons]
+    inventory = sorted(set(p for phones in prons for p in phones))
+    queries = [perturb(rng.choice(prons), inventory, rng)
+               for _ in range(args.queries)]
+
+    tree_time, tree_results = timed(index.nearest, queries, args.k)
+    scan_time, scan_results = timed(index.scan, queries, args.k)
+    assert tree_results == scan_results
+    print("bk-tree:     %8.2f ms/query" % (1000 * tree_time / len(queries)))
+    print("brute force: %8.2f ms/query (%.1fx slower)"
+          % (1000 * scan_time / len(queries), scan_time / tree_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Compare `Word.from_string` and `Word.from_string_fast` throughput.
+
+Usage::
+
+    python benchmarks/parse_speed.py ISLEdict.txt [--clean] [--repeat N]
+"""
+
+from __future__ import print_function
+
+import argparse
+import io
+import time
+
+from islex.tokens import Word, clear_intern_tables
+
+
+def lines_per_second(parse, lines, clean, repeat):
+    """Best of `repeat` cold runs (intern tables cleared before each)."""
+    best = None
+    for _ in range(repeat):
+        clear_intern_tables()
+        start = time.time()
+        for ln in lines:
+            try:
+                parse(ln, clean=clean)
+            except ValueError:
+                pass
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(lines) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('isle_file')
+    parser.add_argument('--clean', action='store_true')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with io.open(args.isle_file, encoding='utf-8') as fh:
+        lines = fh.readlines()
+
+    baseline = lines_per_second(Word.from_string, lines, args.clean,
+                                args.repeat)
+    fast = lines_per_second(Word.from_string_fast, lines, args.clean,
+                            args.repeat)
+    print("%d lines" % len(lines))
+    print("from_string:      %10.0f lines/s" % baseline)
+    print("from_string_fast: %10.0f lines/s (%.2fx)"
+          % (fast, fast / baseline))
+
+
+if __name__ == '__main__':
+    main()
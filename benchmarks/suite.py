@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Benchmark parsing, loading and lookup over synthetic ISLE dictionaries.
+
+For each size, a synthetic data package is generated (see ``synthetic.py``)
+and these are measured:
+
+* ``Word.from_string`` and ``Word.from_string_fast`` throughput,
+* `stream_from_fh` end to end, eager and lazy,
+* `ortho_mapping` build time, and its peak and retained memory (traced
+  separately, so tracing does not skew the timings),
+* `ortho_mapping` lookup latency percentiles, for hits and misses (taken
+  over batches of `LOOKUP_BATCH` lookups, since one lookup is below the
+  timer's resolution).
+
+Usage::
+
+    python benchmarks/suite.py [--sizes 10000 100000 ...] [--output OUT.json]
+                               [--compare BASELINE.json [--tolerance 0.1]
+                                [--latency-tolerance 0.25]]
+
+With ``--compare``, metrics that got worse than the baseline by more than
+the tolerance (``--latency-tolerance`` for lookup latencies; maximum
+latencies excepted) are reported and the exit status is 1.
+"""
+
+from __future__ import print_function
+
+import argparse
+import datetime
+import importlib
+import json
+import os.path
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import islex
+from islex import load
+from islex.tokens import Word, clear_intern_tables
+
+from parse_speed import lines_per_second
+import synthetic
+
+PERCENTILES = (50, 90, 99)
+LOOKUP_BATCH = 100
+
+
+def best_seconds(run, repeat):
+    """Best of `repeat` cold runs of `run()` (intern tables cleared)."""
+    best = None
+    for _ in range(repeat):
+        clear_intern_tables()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def build_mapping(module):
+    load.invalidate(module)
+    clear_intern_tables()
+    return load.ortho_mapping(module)
+
+
+def traced_memory(module):
+    """Peak and retained bytes allocated while building `ortho_mapping`."""
+    load.invalidate(module)
+    clear_intern_tables()
+    tracemalloc.start()
+    try:
+        load.ortho_mapping(module)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, retained
+
+
+def latencies(mapping, keys, batch=LOOKUP_BATCH):
+    """Mean lookup latency in microseconds of each batch of `batch` keys,
+    sorted.
+    """
+    get = mapping.get
+    timings = []
+    for i in range(0, len(keys) - batch + 1, batch):
+        chunk = keys[i:i + batch]
+        start = time.perf_counter()
+        for key in chunk:
+            get(key)
+        timings.append((time.perf_counter() - start) * 1e6 / batch)
+    timings.sort()
+    return timings
+
+
+def percentiles(timings, prefix):
+    result = dict(('%s_p%d_us' % (prefix, p),
+                   timings[min(len(timings) - 1, len(timings) * p // 100)])
+                  for p in PERCENTILES)
+    result['%s_max_us' % prefix] = timings[-1]
+    return result
+
+
+def run_size(workdir, entries, args):
+    name = 'islex_bench_%d' % entries
+    path = synthetic.write(os.path.join(workdir, name), entries,
+                           seed=args.seed, package=True)
+    module = importlib.import_module(name)
+    with open(path, mode='rb') as fh:
+        lines = [ln.decode('utf-8') for ln in fh]
+
+    def stream(lazy):
+        with open(path, mode='rb') as fh:
+            for _ in load.stream_from_fh(fh, lazy=lazy):
+                pass
+
+    result = {
+        'from_string_lines_per_s': lines_per_second(
+            Word.from_string, lines, False, args.repeat),
+        'from_string_fast_lines_per_s': lines_per_second(
+            Word.from_string_fast, lines, False, args.repeat),
+        'stream_seconds': best_seconds(lambda: stream(False), args.repeat),
+        'stream_lazy_seconds': best_seconds(lambda: stream(True),
+                                            args.repeat),
+        'ortho_mapping_seconds': best_seconds(lambda: build_mapping(module),
+                                              args.repeat),
+    }
+    if not args.no_memory:
+        result['peak_bytes'], result['retained_bytes'] = traced_memory(module)
+
+    mapping = build_mapping(module)
+    rng = random.Random(args.seed)
+    keys = list(mapping)
+    hits = [rng.choice(keys).upper() for _ in range(args.lookups)]
+    misses = [u'%s-%d' % (rng.choice(keys), i) for i in range(args.lookups)]
+    result.update(percentiles(latencies(mapping, hits), 'lookup_hit'))
+    result.update(percentiles(latencies(mapping, misses), 'lookup_miss'))
+    load.invalidate(module)
+    return result
+
+
+def higher_is_better(metric):
+    return metric.endswith('_per_s')
+
+
+def regressions(results, baseline, tolerance, latency_tolerance=None):
+    """``(size, metric, old, new)`` for each metric worse than `baseline`.
+
+    Lookup latencies (``*_us``) vary more between runs than the throughput
+    and memory figures, and are held to `latency_tolerance` if given.
+    """
+    if latency_tolerance is None:
+        latency_tolerance = tolerance
+    worse = []
+    for size, metrics in sorted(results.items(), key=lambda i: int(i[0])):
+        for metric, new in sorted(metrics.items()):
+            old = baseline.get(size, {}).get(metric)
+            if not old or metric.endswith('_max_us'):  # too noisy
+                continue
+            change = (old - new if higher_is_better(metric) else new - old)
+            limit = (latency_tolerance if metric.endswith('_us')
+                     else tolerance)
+            if change / old > limit:
+                worse.append((size, metric, old, new))
+    return worse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10000, 100000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--lookups', type=int, default=10000)
+    parser.add_argument('--no-memory', action='store_true',
+                        help="skip the (slow) traced memory measurement")
+    parser.add_argument('--output', help="write results as JSON here")
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help="JSON results of an earlier run")
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    parser.add_argument('--latency-tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='islex-bench-')
+    sys.path.insert(0, workdir)
+    results = {}
+    try:
+        for entries in args.sizes:
+            results[str(entries)] = run_size(workdir, entries, args)
+            print(json.dumps({entries: results[str(entries)]}, indent=2,
+                             sort_keys=True))
+    finally:
+        sys.path.remove(workdir)
+        shutil.rmtree(workdir)
+
+    report = {
+        'meta': {
+            'islex': islex.__version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'date': datetime.datetime.now().isoformat(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(report, fh, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)['results']
+        worse = regressions(results, baseline, args.tolerance,
+                            args.latency_tolerance)
+        for size, metric, old, new in worse:
+            print("REGRESSION %s entries: %s %.4g -> %.4g"
+                  % (size, metric, old, new))
+        if worse:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Generate a synthetic ISLE dictionary file.
+
+Tag, morph, syllable and phone frequencies roughly follow islex-core; about
+a third of orthos recur with another pron or tagging, and a few are
+multiword (``a_b``, one pron per word), as in the real dictionary.
+
+Usage::
+
+    python benchmarks/synthetic.py OUTPUT --entries N [--seed S] [--package]
+
+With ``--package``, OUTPUT is a directory made into an importable data
+package (``__init__.py`` plus ``entries.txt``), like islex-core.
+"""
+
+from __future__ import print_function
+
+import argparse
+import bisect
+import io
+import itertools
+import os.path
+import random
+
+ONSETS = (
+    (u'', 30), (u'ɹ', 6), (u's', 6), (u't', 6), (u'n', 5), (u'k', 7),
+    (u'l', 6), (u'd', 5), (u'm', 5), (u'p', 5), (u'b', 4), (u'f', 3),
+    (u'v', 2), (u'ʃ', 2), (u'g', 2), (u'w', 2), (u'h', 2), (u'dʒ', 2),
+    (u'tʃ', 1), (u'j', 1), (u'z', 1), (u'ð', 0.3), (u'ʒ', 0.2),
+    (u's t', 1.5), (u'p ɹ', 1.5), (u'k ɹ', 1), (u't ɹ', 1), (u'b l', 0.7),
+    (u'k l', 0.7), (u'f l', 0.5), (u's p', 0.5), (u's t ɹ', 0.3),
+)
+VOWELS = (
+    (u'ə', 26), (u'ɪ', 22), (u'i', 11), (u'ɚ', 10), (u'ɛ', 13), (u'æ', 11),
+    (u'ɑ', 10), (u'ei', 9), (u'ʌ', 5), (u'oʊ', 7), (u'ɑɪ', 7), (u'ɔ', 4),
+    (u'u', 5), (u'ɝ', 3), (u'aʊ', 2), (u'ʊ', 1), (u'ɔi', 0.6),
+    (u'n̩', 8), (u'l̩', 4),
+)
+CODAS = (
+    (u'', 45), (u'n', 8), (u's', 7), (u't', 7), (u'z', 5), (u'd', 5),
+    (u'l', 4), (u'k', 5), (u'ŋ', 3), (u'm', 3), (u'ɹ', 3), (u'p', 2),
+    (u't˺', 3), (u'd˺', 1), (u'ɵ', 1), (u'n t', 1.5), (u'n d', 1),
+    (u's t', 1), (u'k s', 0.7), (u'n z', 0.7),
+)
+# Vowels that never carry stress.
+UNSTRESSABLE = frozenset([u'ə', u'ɚ', u'n̩', u'l̩'])
+
+SYLLABLES = ((1, 8.5), (2, 24.5), (3, 18), (4, 9.5), (5, 3.8), (6, 0.9),
+             (7, 0.15), (8, 0.03))
+TAGS = (
+    (u'nn', 28066), (u'jj', 13269), (u'nns', 11015), (u'vb', 9103),
+    (u'nnp_surname', 8557), (u'nnp', 5645), (u'vbn', 5232), (u'vbd', 5226),
+    (u'vbg', 4604), (u'vbz', 3965), (u'rb', 3027), (u'vbp', 1327),
+    (u'nnp_boyname', 655), (u'nnp_girlname', 615), (u'jjr', 541),
+    (u'nnps', 539), (u'nnp_city', 312), (u'jjs', 239), (u'prp', 189),
+    (u'rp', 187), (u'in', 177), (u'nnp_country', 172), (u'uh', 128),
+    (u'cc', 127), (u'fw', 122), (u'nnp_company', 116), (u'dt', 101),
+    (u'abbreviation', 99), (u'nnp_state', 65), (u'rbr', 55), (u'cd', 49),
+    (u'md', 42), (u'nnp_organization', 34), (u'wrb', 28),
+    (u'nnp_product', 21), (u'nnp_month', 17), (u'wdt', 16), (u'wp', 14),
+    (u'rbs', 13), (u'sym', 10),
+)
+TAG_COUNTS = ((1, 39425), (2, 17672), (3, 5817), (4, 1725), (5, 587),
+              (6, 209), (7, 64))
+MORPH_COUNTS = ((0, 24948), (2, 31384), (3, 8190), (4, 881), (5, 94))
+SUFFIXES = ((u's', 30), (u'ed', 12), (u'ing', 12), (u'er', 8), (u'ly', 7),
+            (u'ation', 4), (u'ment', 3), (u'ness', 3), (u'ist', 2),
+            (u'able', 2), (u'al', 3), (u'ic', 2), (u'ity', 2), (u'es', 4))
+LETTERS = {
+    u'ə': u'a', u'ɪ': u'i', u'i': u'ee', u'ɚ': u'er', u'ɛ': u'e',
+    u'æ': u'a', u'ɑ': u'o', u'ei': u'ay', u'ʌ': u'u', u'oʊ': u'o',
+    u'ɑɪ': u'i', u'ɔ': u'aw', u'u': u'oo', u'ɝ': u'ir', u'aʊ': u'ow',
+    u'ʊ': u'oo', u'ɔi': u'oy', u'n̩': u'en', u'l̩': u'le', u'ɹ': u'r',
+    u'ŋ': u'ng', u't˺': u't', u'd˺': u'd', u'ɵ': u'th', u'ð': u'th',
+    u'ʃ': u'sh', u'ʒ': u'zh', u'dʒ': u'j', u'tʃ': u'ch', u'j': u'y',
+}
+REPEAT_RATE = 0.35  # chance an entry reuses a recent ortho
+MULTIWORD_RATE = 0.03
+
+
+class _Choice(object):
+    """Weighted choice from ``(value, weight)`` pairs."""
+
+    def __init__(self, pairs):
+        self.values = [v for v, _ in pairs]
+        self.cumulative = list(itertools.accumulate(w for _, w in pairs))
+
+    def __call__(self, rng):
+        x = rng.random() * self.cumulative[-1]
+        return self.values[bisect.bisect_right(self.cumulative, x)]
+
+
+_onset = _Choice(ONSETS)
+_vowel = _Choice(VOWELS)
+_coda = _Choice(CODAS)
+_n_syllables = _Choice(SYLLABLES)
+_tag = _Choice(TAGS)
+_n_tags = _Choice(TAG_COUNTS)
+_n_morphs = _Choice(MORPH_COUNTS)
+_suffix = _Choice(SUFFIXES)
+
+
+def _pron(rng):
+    """An ISLE pron string and the phones it was built from."""
+    n = _n_syllables(rng)
+    primary = rng.randrange(n)
+    sylls = []
+    phones = []
+    for i in range(n):
+        vowel = _vowel(rng)
+        while i == primary and vowel in UNSTRESSABLE:
+            vowel = _vowel(rng)
+        if vowel not in UNSTRESSABLE:
+            if i == primary:
+                vowel = u'ˈ' + vowel
+            elif rng.random() < 0.15:
+                vowel = u'ˌ' + vowel
+        syll = [p for p in (_onset(rng), vowel, _coda(rng)) if p]
+        sylls.append(u' '.join(syll))
+        phones.extend(u' '.join(syll).split())
+    return u' . '.join(sylls), phones
+
+
+def _spell(phones):
+    return u''.join(LETTERS.get(p.lstrip(u'ˈˌ'), p.lstrip(u'ˈˌ'))
+                    for p in phones)
+
+
+def _tags(rng, morphs):
+    tags = []
+    for _ in range(_n_tags(rng)):
+        t = _tag(rng)
+        if t not in tags:
+            tags.append(t)
+    if morphs:
+        tags.insert(0, u'+' + u'+'.join(morphs))
+    return u','.join(tags)
+
+
+def generate(entries, seed=0):
+    """Yield `entries` synthetic ISLE lines (without newlines)."""
+    rng = random.Random(seed)
+    recent = []
+    for _ in range(entries):
+        words = 2 if rng.random() < MULTIWORD_RATE else 1
+        prons = [_pron(rng) for _ in range(words)]
+        if recent and rng.random() < REPEAT_RATE:
+            ortho, morphs = rng.choice(recent)
+        else:
+            ortho = u'_'.join(_spell(phones) for _, phones in prons)
+            n = _n_morphs(rng) if words == 1 else 0
+            morphs = ([ortho] + [_suffix(rng) for _ in range(n - 1)]
+                      if n else [])
+            if n:
+                ortho += u''.join(morphs[1:])
+            recent.append((ortho, morphs))
+            del recent[:-100]
+        yield u'%s(%s) # %s #' % (ortho, _tags(rng, morphs),
+                                  u' # '.join(p for p, _ in prons))
+
+
+PACKAGE_INIT = u'''\
+from pkg_resources import resource_stream
+
+from islex.load import stream_from_fh
+
+
+def entries_stream():
+    return stream_from_fh(resource_stream(__name__, 'entries.txt'))
+'''
+
+
+def write(path, entries, seed=0, package=False):
+    """Write a synthetic file to `path` (or a data package directory)."""
+    if package:
+        if not os.path.exists(path):
+            os.makedirs(path)
+        with io.open(os.path.join(path, '__init__.py'), 'w',
+                     encoding='utf-8') as fh:
+            fh.write(PACKAGE_INIT)
+        path = os.path.join(path, 'entries.txt')
+    with io.open(path, 'w', encoding='utf-8', newline='\n') as fh:
+        fh.writelines(ln + u'\n' for ln in generate(entries, seed))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output')
+    parser.add_argument('--entries', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--package', action='store_true')
+    args = parser.parse_args()
+    print(write(args.output, args.entries, args.seed, args.package))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Compare `Word.to_string` with `islex.writer` throughput per format.
+
+Usage::
+
+    python benchmarks/write_speed.py ISLEdict.txt [--repeat N]
+"""
+
+from __future__ import print_function
+
+import argparse
+import io
+import time
+
+from islex.load import stream_from_fh
+from islex.writer import FORMATS, write_words
+
+
+def words_per_second(write, words, repeat):
+    """Best of `repeat` runs of `write(words, fh)` into memory."""
+    best = None
+    for _ in range(repeat):
+        fh = io.StringIO()
+        start = time.time()
+        write(words, fh)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(words) / best
+
+
+def write_to_string(words, fh):
+    for w in words:
+        fh.write(w.to_string())
+        fh.write(u'\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('isle_file')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.isle_file, mode='rb') as fh:
+        words = list(stream_from_fh(fh))
+
+    baseline = words_per_second(write_to_string, words, args.repeat)
+    print("%d words" % len(words))
+    print("Word.to_string: %10.0f words/s" % baseline)
+    for fmt in FORMATS:
+        rate = words_per_second(
+            lambda ws, fh: write_words(ws, fh, format=fmt), words,
+            args.repeat)
+        print("%-14s %10.0f words/s (%.2fx)"
+              % (fmt + ':', rate, rate / baseline))
+
+
+if __name__ == '__main__':
+    main()
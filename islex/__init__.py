@@ -3,3 +3,19 @@
 __author__ = 'Jeremy G. Kahn'
 __email__ = 'jeremy@trochee.net'
 __version__ = '0.2.5'
+
+# Submodules are imported on first attribute access (``islex.load``), so
+# ``import islex`` costs nothing and each process pays only for what it uses.
+_SUBMODULES = frozenset(['cache', 'columnar', 'compiled', 'index', 'load',
+                         'nearest', 'tokens', 'writer'])
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        import importlib
+        return importlib.import_module('islex.' + name)
+    raise AttributeError("module 'islex' has no attribute %r" % name)
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES)
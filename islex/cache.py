@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""Thread-safe, bounded cache for expensive loaded structures.
+
+`BuildCache` builds each value at most once even when several threads ask
+for it at the same time, evicts least recently used values beyond an entry
+count or an approximate memory budget, and keeps hit/miss/build statistics.
+`islex.load` keeps its mappings and indexes in one of these.
+"""
+
+import collections
+import sys
+import threading
+import time
+
+import attr
+import enum
+
+
+def deep_sizeof(obj):
+    """Approximate bytes reachable from `obj`, counting shared objects once.
+
+    Follows containers, instance ``__dict__`` and ``__slots__``; classes,
+    modules, functions and enum members are not counted.
+    """
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, (type, enum.Enum)) or callable(o):
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        if hasattr(o, '__dict__'):
+            stack.append(vars(o))
+        for cls in type(o).__mro__:
+            slots = getattr(cls, '__slots__', ())
+            if isinstance(slots, str):
+                slots = (slots,)
+            for name in slots:
+                value = getattr(o, name, None)
+                if value is not None:
+                    stack.append(value)
+    return total
+
+
+@attr.s
+class CacheStats(object):
+    hits = attr.ib(default=0)
+    misses = attr.ib(default=0)
+    builds = attr.ib(default=0)
+    evictions = attr.ib(default=0)
+    build_seconds = attr.ib(default=0.0)
+    entries = attr.ib(default=0)
+    bytes = attr.ib(default=0)
+
+
+class BuildCache(object):
+    """LRU cache of values built on demand by `get`.
+
+    `max_entries` and `max_bytes` (None for unbounded) may be changed at any
+    time; the byte budget uses `weigh` (`deep_sizeof` by default), which is
+    only called when `max_bytes` is set.  The most recently built value is
+    never evicted to make room for itself.
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, weigh=deep_sizeof):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.weigh = weigh
+        self._lock = threading.Lock()
+        self._building = {}  # key -> Lock held while building that key
+        self._entries = collections.OrderedDict()  # key -> (value, bytes)
+        self._stats = CacheStats()
+
+    def get(self, key, build):
+        """Return the value for `key`, calling `build()` to make it if needed.
+
+        Concurrent callers for the same key wait for a single build.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return self._entries[key][0]
+            self._stats.misses += 1
+            key_lock = self._building.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    return self._entries[key][0]
+            start = time.time()
+            try:
+                value = build()
+                size = self.weigh(value) if self.max_bytes is not None else 0
+            except BaseException:
+                with self._lock:
+                    self._building.pop(key, None)
+                raise
+            elapsed = time.time() - start
+            with self._lock:
+                self._building.pop(key, None)
+                self._entries[key] = (value, size)
+                self._stats.builds += 1
+                self._stats.build_seconds += elapsed
+                self._evict()
+            return value
+
+    def _evict(self):
+        while len(self._entries) > 1 and (
+                (self.max_entries is not None
+                 and len(self._entries) > self.max_entries)
+                or (self.max_bytes is not None
+                    and self._bytes() > self.max_bytes)):
+            self._entries.popitem(last=False)
+            self._stats.evictions += 1
+
+    def _bytes(self):
+        return sum(size for _, size in self._entries.values())
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def invalidate(self, key):
+        """Drop `key` if cached; it will be rebuilt on next use."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """Drop every cached key for which `predicate(key)` is true."""
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Snapshot of the cache's `CacheStats`."""
+        with self._lock:
+            return attr.evolve(self._stats, entries=len(self._entries),
+                               bytes=self._bytes())
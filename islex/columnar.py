@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""Columnar (CSR-style) layout of a whole dictionary.
+
+`ColumnarLexicon` holds every word as flat typed arrays: a phone symbol
+table and phone ids, with offset arrays nesting phones into syllables,
+syllables into prons and prons into words, plus per-word POS codes.  The
+columns are stdlib ``array.array`` objects, which expose the buffer
+protocol, so ``as_numpy`` (or ``numpy.frombuffer``) views them without
+copying.  `Word` objects are rebuilt only when asked for.
+
+NumPy is optional; it is needed only for `ColumnarLexicon.as_numpy`,
+`ColumnarLexicon.save_npz` and `ColumnarLexicon.load_npz`.
+"""
+
+from array import array
+
+from islex.tokens import (Word, Pos, Morph, Pron, Syllable, PosCategory,
+                          EntityCategory)
+
+# Entity code for a `Pos` without an entity type.
+NO_ENTITY = -1
+
+# Column name -> array typecode.
+COLUMNS = (
+    ('phone_ids', 'H'),
+    ('syll_offsets', 'I'),  # into phone_ids, one per syllable (+1)
+    ('pron_offsets', 'I'),  # into syllables, one per pron (+1)
+    ('word_offsets', 'I'),  # into prons, one per word (+1)
+    ('pos_offsets', 'I'),  # into pos codes, one per word (+1)
+    ('pos_categories', 'B'),  # PosCategory values
+    ('pos_entities', 'b'),  # EntityCategory values, or NO_ENTITY
+    ('morph_offsets', 'I'),  # into morphs, one per word (+1)
+)
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("islex.columnar needs numpy for this; "
+                          "install islex[numpy]")
+    return numpy
+
+
+class ColumnarLexicon(object):
+    """A dictionary stored as flat columns; see the module docstring.
+
+    `phones` is the phone symbol table (indexed by phone id), `orthos` and
+    `morphs` are lists of strings (morphs as ISLE ``+a+b`` strings), and the
+    remaining keyword arguments are the `COLUMNS`, as any integer sequences.
+    """
+
+    def __init__(self, phones, orthos, morphs, **columns):
+        self.phones = list(phones)
+        self.orthos = list(orthos)
+        self.morphs = list(morphs)
+        for name, typecode in COLUMNS:
+            values = columns.pop(name)
+            if not isinstance(values, array):
+                values = array(typecode, values)
+            setattr(self, name, values)
+        if columns:
+            raise TypeError("unexpected columns: %s" % ', '.join(columns))
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        """Build from an ortho mapping, e.g. from `islex.load.ortho_mapping`.
+        """
+        return cls.from_words(w for ws in mapping.values() for w in ws)
+
+    @classmethod
+    def from_words(cls, words):
+        """Build from an iterable of `Word`, e.g. `islex.load.stream_from_fh`.
+        """
+        phone_ids = {}
+        orthos = []
+        morphs = []
+        cols = dict((name, array(typecode)) for name, typecode in COLUMNS)
+        for offsets in ('syll_offsets', 'pron_offsets', 'word_offsets',
+                        'pos_offsets', 'morph_offsets'):
+            cols[offsets].append(0)
+        for w in words:
+            orthos.append(w.ortho)
+            for pron in w.prons:
+                for syll in pron.sylls:
+                    cols['phone_ids'].extend(
+                        phone_ids.setdefault(p, len(phone_ids))
+                        for p in syll.ipa)
+                    cols['syll_offsets'].append(len(cols['phone_ids']))
+                cols['pron_offsets'].append(len(cols['syll_offsets']) - 1)
+            cols['word_offsets'].append(len(cols['pron_offsets']) - 1)
+            for pos in w.pos:
+                cols['pos_categories'].append(pos.category.value)
+                cols['pos_entities'].append(
+                    NO_ENTITY if pos.entity_type is None
+                    else pos.entity_type.value)
+            cols['pos_offsets'].append(len(cols['pos_categories']))
+            morphs.extend(m.to_string() for m in w.morphs)
+            cols['morph_offsets'].append(len(morphs))
+        phones = sorted(phone_ids, key=phone_ids.get)
+        return cls(phones, orthos, morphs, **cols)
+
+    def __len__(self):
+        return len(self.orthos)
+
+    def _pron(self, n):
+        sylls = []
+        offsets = self.syll_offsets
+        for s in range(self.pron_offsets[n], self.pron_offsets[n + 1]):
+            ids = self.phone_ids[offsets[s]:offsets[s + 1]]
+            sylls.append(Syllable.from_string(
+                u' '.join(self.phones[i] for i in ids)))
+        return Pron(sylls=tuple(sylls))
+
+    def word(self, i):
+        """Rebuild the `i`-th `Word`."""
+        pos = tuple(
+            Pos(category=PosCategory(self.pos_categories[p]),
+                entity_type=(None if self.pos_entities[p] == NO_ENTITY
+                             else EntityCategory(self.pos_entities[p])))
+            for p in range(self.pos_offsets[i], self.pos_offsets[i + 1]))
+        morphs = tuple(
+            Morph.from_string(m) for m in
+            self.morphs[self.morph_offsets[i]:self.morph_offsets[i + 1]])
+        prons = tuple(self._pron(n) for n in range(self.word_offsets[i],
+                                                   self.word_offsets[i + 1]))
+        return Word(ortho=self.orthos[i], pos=pos, morphs=morphs, prons=prons)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.word(i)
+
+    def as_numpy(self):
+        """Dict of zero-copy NumPy views of the integer columns."""
+        numpy = _import_numpy()
+        return dict((name, numpy.frombuffer(getattr(self, name),
+                                            dtype=typecode))
+                    for name, typecode in COLUMNS)
+
+    def save_npz(self, path):
+        """Write all columns and string tables to a NumPy ``.npz`` file."""
+        numpy = _import_numpy()
+        numpy.savez(path, phones=numpy.array(self.phones),
+                    orthos=numpy.array(self.orthos),
+                    morphs=numpy.array(self.morphs, dtype=numpy.str_),
+                    **self.as_numpy())
+
+    @classmethod
+    def load_npz(cls, path):
+        numpy = _import_numpy()
+        with numpy.load(path, allow_pickle=False) as data:
+            columns = dict((name, array(typecode, data[name].tobytes()))
+                           for name, typecode in COLUMNS)
+            return cls(data['phones'].tolist(), data['orthos'].tolist(),
+                       data['morphs'].tolist(), **columns)
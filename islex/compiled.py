@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""Compiled, memory-mapped ortho index.
+
+``compile_index`` writes a stream of `Word` objects to a compact binary file;
+``CompiledMapping`` opens that file read-only with ``mmap`` and decodes words
+only when they are looked up, so opening is near-instant and the pages are
+shared between every process that maps the same file.  ``shared_mapping``
+lets a pool of worker processes compile the file once and all map it.
+
+File layout (all integers little-endian unsigned 32 bit)::
+
+    header          magic, format version, n_keys, n_words
+    key_offsets     n_keys + 1 offsets into the key blob
+    word_starts     n_keys + 1 indexes into record_offsets, one run per key
+    record_offsets  n_words + 1 offsets into the record blob
+    key blob        sorted, lowercased, utf-8 ortho keys
+    record blob     utf-8 ISLE lines, one per word
+"""
+
+from array import array
+import bisect
+import mmap
+import os
+import struct
+import sys
+
+from six.moves import collections_abc
+
+MAGIC = b'ISLX'
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<4sIII')
+_U32 = 4
+
+
+def _u32_array(values):
+    arr = array('I', values)
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def compile_index(words, path):
+    """Write `words` to a compiled index at `path`.
+
+    Words are grouped by lowercased ortho, in the same way as
+    `islex.load.ortho_mapping`.  The file is written next to `path` and
+    moved into place, so readers never see a partial index.
+    """
+    groups = {}
+    for w in words:
+        groups.setdefault(w.ortho.lower(), []).append(w)
+    keys = sorted(groups)
+
+    key_offsets = [0]
+    word_starts = [0]
+    record_offsets = [0]
+    key_blob = bytearray()
+    record_blob = bytearray()
+    for key in keys:
+        key_blob += key.encode('utf-8')
+        key_offsets.append(len(key_blob))
+        for w in groups[key]:
+            record_blob += w.to_string().encode('utf-8')
+            record_offsets.append(len(record_blob))
+        word_starts.append(len(record_offsets) - 1)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as out:
+        out.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(keys),
+                               len(record_offsets) - 1))
+        out.write(_u32_array(key_offsets))
+        out.write(_u32_array(word_starts))
+        out.write(_u32_array(record_offsets))
+        out.write(key_blob)
+        out.write(record_blob)
+    os.replace(tmp_path, path)
+
+
+class _U32Table(object):
+    """Read-only view of a little-endian uint32 array inside a buffer."""
+
+    def __init__(self, buf, offset, count):
+        view = memoryview(buf)[offset:offset + count * _U32]
+        if sys.byteorder == 'little':
+            self._values = view.cast('I')
+        else:
+            self._values = array('I', view.tobytes())
+            self._values.byteswap()
+
+    def __getitem__(self, i):
+        return self._values[i]
+
+    def __len__(self):
+        return len(self._values)
+
+    def release(self):
+        if isinstance(self._values, memoryview):
+            self._values.release()
+
+
+class _SortedKeys(object):
+    """Sequence of encoded keys, suitable for `bisect`."""
+
+    def __init__(self, buf, offsets, base):
+        self._buf = buf
+        self._offsets = offsets
+        self._base = base
+
+    def __getitem__(self, i):
+        return self._buf[self._base + self._offsets[i]:
+                         self._base + self._offsets[i + 1]]
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+
+class CompiledMapping(collections_abc.Mapping):
+    """Case-insensitive, read-only mapping over a compiled index file.
+
+    Values are lists of `Word`, parsed on each lookup.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_keys, n_words = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError("%s is not a compiled islex index" % path)
+        if version != FORMAT_VERSION:
+            raise ValueError("%s has unsupported index version %d"
+                             % (path, version))
+        pos = _HEADER.size
+        self._key_offsets = _U32Table(self._mm, pos, n_keys + 1)
+        pos += (n_keys + 1) * _U32
+        self._word_starts = _U32Table(self._mm, pos, n_keys + 1)
+        pos += (n_keys + 1) * _U32
+        self._record_offsets = _U32Table(self._mm, pos, n_words + 1)
+        pos += (n_words + 1) * _U32
+        self._keys = _SortedKeys(self._mm, self._key_offsets, pos)
+        self._record_base = pos + self._key_offsets[n_keys]
+
+    def _find(self, key):
+        encoded = key.lower().encode('utf-8')
+        i = bisect.bisect_left(self._keys, encoded)
+        if i < len(self._keys) and self._keys[i] == encoded:
+            return i
+        raise KeyError(key)
+
+    def _word(self, n):
+        # Imported here so that opening a mapping and testing membership
+        # never loads islex.tokens (and attrs).
+        from islex.tokens import Word
+        start = self._record_base + self._record_offsets[n]
+        end = self._record_base + self._record_offsets[n + 1]
+        # Not interned: a worker serving lookups should not keep a table
+        # of every syllable it has returned.
+        return Word.from_string(self._mm[start:end].decode('utf-8'),
+                                intern=False)
+
+    def __getitem__(self, key):
+        i = self._find(key)
+        return [self._word(n) for n in range(self._word_starts[i],
+                                             self._word_starts[i + 1])]
+
+    def __contains__(self, key):
+        try:
+            self._find(key)
+        except KeyError:
+            return False
+        return True
+
+    def lookup_many(self, tokens):
+        """Batch lookup; see `islex.load.CaseInsensitiveMapping.lookup_many`.
+        """
+        hits = {}
+        oov = []
+        for token in dict.fromkeys(tokens):
+            try:
+                hits[token] = self[token]
+            except KeyError:
+                oov.append(token)
+        return hits, oov
+
+    def __iter__(self):
+        for i in range(len(self._keys)):
+            yield self._keys[i].decode('utf-8')
+
+    def __len__(self):
+        return len(self._keys)
+
+    def close(self):
+        for table in (self._key_offsets, self._word_starts,
+                      self._record_offsets):
+            table.release()
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def shared_mapping(path, words):
+    """Open the compiled index at `path`, first compiling it from
+    ``words()`` if it does not exist yet.
+
+    Meant for pools of worker processes that all call it with the same
+    `path`: the first to take an exclusive lock on ``path + '.lock'``
+    compiles the index while the others wait, then every worker maps the
+    same file read-only, so the dictionary is in memory once however many
+    workers there are.  Put `path` on a tmpfs such as ``/dev/shm`` to keep
+    it in shared memory, and delete it to have the next caller recompile.
+    Needs ``fcntl`` (POSIX).
+    """
+    import fcntl
+    with open(path + '.lock', 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            if not os.path.exists(path):
+                compile_index(words(), path)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+    return CompiledMapping(path)
@@ -0,0 +1,523 @@
+# -*- coding: utf-8 -*-
+"""Secondary indexes over loaded `Word` objects."""
+
+import bisect
+import enum
+import re
+import sys
+
+from six import string_types
+from six.moves import collections_abc
+
+from islex.tokens import PRIMARY_STRESS, SECONDARY_STRESS, Pron
+
+_MAX_CHAR = u'\U0010ffff'
+_WILDCARDS = re.compile(r'([*?])')
+
+
+def strip_stress(phone):
+    """Return the IPA string `phone` without stress marks."""
+    return phone.replace(PRIMARY_STRESS, u'').replace(SECONDARY_STRESS, u'')
+
+
+def pron_key(pron, syllables=False, stress=True):
+    """Hashable key for `pron` (a `Pron` or an ISLE pron string).
+
+    The key is a tuple of phone strings; with `syllables` it is a tuple of
+    per-syllable tuples instead.  Without `stress`, stress marks are
+    dropped from every phone.
+    """
+    if isinstance(pron, string_types):
+        pron = Pron.from_string(pron)
+    if syllables:
+        key = tuple(syll.ipa for syll in pron.sylls)
+        if not stress:
+            key = tuple(tuple(strip_stress(p) for p in syll) for syll in key)
+    else:
+        key = pron.ipa
+        if not stress:
+            key = tuple(strip_stress(p) for p in key)
+    return key
+
+
+def rhyme_key(pron):
+    """The rhyming part of `pron`: its phones from the last primary-stressed
+    vowel onward (else the last stressed one, else all phones), without
+    stress marks.
+    """
+    if isinstance(pron, string_types):
+        pron = Pron.from_string(pron)
+    pattern = pron.stress_pattern
+    last = pattern.rfind(u'1')
+    if last < 0:
+        last = pattern.rfind(u'2')
+    if last < 0:
+        phones = pron.ipa
+    else:
+        sylls = pron.sylls
+        phones = [ph.value for ph in sylls[last].rhyme]
+        for syll in sylls[last + 1:]:
+            phones.extend(syll.ipa)
+    return tuple(strip_stress(p) for p in phones)
+
+
+class PronIndex(collections_abc.Mapping):
+    """Read-only mapping from pronunciation to the words that have it.
+
+    Keys are `pron_key` tuples; lookups also accept a `Pron` or an ISLE pron
+    string such as ``u"t ˈu"``.  Values are tuples of `Word`.
+    """
+
+    def __init__(self, words, syllables=False, stress=True):
+        self.syllables = syllables
+        self.stress = stress
+        store = {}
+        for w in words:
+            for pron in w.prons:
+                entries = store.setdefault(self._key(pron), [])
+                if not entries or entries[-1] is not w:
+                    entries.append(w)
+        self._store = dict((k, tuple(v)) for k, v in store.items())
+
+    def _key(self, pron):
+        if isinstance(pron, tuple):
+            return pron
+        return pron_key(pron, syllables=self.syllables, stress=self.stress)
+
+    def __getitem__(self, pron):
+        return self._store[self._key(pron)]
+
+    def __iter__(self):
+        return iter(self._store)
+
+    def __len__(self):
+        return len(self._store)
+
+    def homophones(self, word):
+        """Words other than `word` sharing one of its pronunciations.
+
+        Entries with the same ortho (ignoring case) are not homophones.
+        """
+        return self._others(word)
+
+    def _others(self, word):
+        ortho = word.ortho.lower()
+        found = []
+        seen = set()
+        for pron in word.prons:
+            for other in self.get(pron, ()):
+                if other.ortho.lower() != ortho and id(other) not in seen:
+                    seen.add(id(other))
+                    found.append(other)
+        return found
+
+
+class RhymeIndex(PronIndex):
+    """Read-only mapping from `rhyme_key` to the words ending that way.
+
+    Lookups accept a `Pron`, an ISLE pron string or a rhyme key tuple.
+    """
+
+    def __init__(self, words):
+        super(RhymeIndex, self).__init__(words)
+
+    def _key(self, pron):
+        if isinstance(pron, tuple):
+            return pron
+        return rhyme_key(pron)
+
+    def rhymes(self, word):
+        """Words other than `word` rhyming with one of its pronunciations."""
+        return self._others(word)
+
+
+class PhoneNgramIndex(object):
+    """Inverted index from phone n-grams to the words containing them.
+
+    Every n-gram of length 1 to `max_n` is indexed; longer queries intersect
+    the postings of their `max_n`-grams and then check each candidate.
+    Stress marks are ignored unless `stress` is set.
+    """
+
+    def __init__(self, words, max_n=3, stress=False):
+        self.max_n = max_n
+        self.stress = stress
+        self._prons = []  # (word, phone tuple)
+        self._postings = {}
+        for w in words:
+            for pron in w.prons:
+                phones = pron_key(pron, stress=stress)
+                pron_id = len(self._prons)
+                self._prons.append((w, phones))
+                for n in range(1, max_n + 1):
+                    for i in range(len(phones) - n + 1):
+                        self._postings.setdefault(
+                            phones[i:i + n], set()).add(pron_id)
+
+    def _query(self, phones):
+        if isinstance(phones, string_types):
+            phones = phones.split()
+        phones = tuple(phones)
+        if not self.stress:
+            phones = tuple(strip_stress(p) for p in phones)
+        return phones
+
+    def search(self, phones):
+        """Words with a pron containing the phone sequence `phones` (a tuple
+        of phones or a space-separated string such as ``u"s t ɹ"``), in
+        index order.
+        """
+        phones = self._query(phones)
+        n = min(len(phones), self.max_n)
+        if not n:
+            return []
+        grams = sorted((self._postings.get(phones[i:i + n], set())
+                        for i in range(len(phones) - n + 1)), key=len)
+        candidates = set.intersection(*grams)
+        found = []
+        for pron_id in sorted(candidates):
+            w, pron_phones = self._prons[pron_id]
+            if n < len(phones) and not _contains(pron_phones, phones):
+                continue
+            if not found or found[-1] is not w:
+                found.append(w)
+        return found
+
+
+def _contains(haystack, needle):
+    n = len(needle)
+    return any(haystack[i:i + n] == needle
+               for i in range(len(haystack) - n + 1))
+
+
+def _prefix_range(keys, prefix):
+    return (bisect.bisect_left(keys, prefix),
+            bisect.bisect_left(keys, prefix + _MAX_CHAR))
+
+
+class OrthoSearch(object):
+    """Prefix and glob search over lowercased ortho keys.
+
+    Keys are held in a sorted list, plus a sorted list of the reversed keys
+    so that patterns with a leading wildcard (``"*ing"``, ``"?at"``) can be
+    narrowed by their literal suffix.  Work is proportional to the number of
+    keys sharing the pattern's longest literal prefix or suffix.
+    """
+
+    def __init__(self, keys):
+        self._keys = sorted(set(k.lower() for k in keys))
+        self._rkeys = sorted(k[::-1] for k in self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        key = key.lower()
+        i = bisect.bisect_left(self._keys, key)
+        return i < len(self._keys) and self._keys[i] == key
+
+    def prefix(self, prefix):
+        """All keys starting with `prefix`, in sorted order."""
+        lo, hi = _prefix_range(self._keys, prefix.lower())
+        return self._keys[lo:hi]
+
+    def glob(self, pattern):
+        """All keys matching `pattern`, where ``*`` matches any run of
+        characters and ``?`` any single character.  Sorted.
+        """
+        pattern = pattern.lower()
+        pieces = _WILDCARDS.split(pattern)
+        if len(pieces) == 1:
+            return [pattern] if pattern in self else []
+        head, tail = pieces[0], pieces[-1]
+        if len(head) >= len(tail):
+            lo, hi = _prefix_range(self._keys, head)
+            candidates = self._keys[lo:hi]
+        else:
+            lo, hi = _prefix_range(self._rkeys, tail[::-1])
+            candidates = sorted(k[::-1] for k in self._rkeys[lo:hi])
+        regex = re.compile(u''.join(
+            u'.*' if piece == u'*' else u'.' if piece == u'?'
+            else re.escape(piece) for piece in pieces), re.DOTALL)
+        return [k for k in candidates if regex.fullmatch(k)]
+
+    def memory_usage(self):
+        """Approximate bytes held by the index (lists and key strings)."""
+        return (sys.getsizeof(self._keys) + sys.getsizeof(self._rkeys)
+                + sum(sys.getsizeof(k) for k in self._keys)
+                + sum(sys.getsizeof(k) for k in self._rkeys))
+
+
+@enum.unique
+class MorphRole(enum.Enum):
+    PREFIX = 1
+    STEM = 2
+    SUFFIX = 3
+
+
+# Common English affixes, from the morphemes that most often begin or end
+# ISLE analyses.
+PREFIXES = frozenset(u"""
+    a anti auto bi co counter de di dis em en ex extra fore hyper il im in
+    inter ir mal mega micro mid mini mis mono multi neo non out over pan
+    para poly post pre pro pseudo re semi step sub super tele trans tri
+    ultra un under uni
+""".split())
+SUFFIXES = frozenset(u"""
+    's 'd 'll 're 've n't able ability ably age al ally an ance ancy ant
+    ar arian ary ate ation cation dom ed ee eer en ence ency ent er ery es
+    ess est ette ful hood ial ian ible ic ical ied ier ies iest ify ily ing
+    ion ish ism ist ite ity ive ization ize less let ling ly ment ness or
+    ory ous s ship ster th tion ual ward wise y
+""".split())
+
+
+def morph_roles(emes):
+    """The `MorphRole` of each morpheme in `emes` (a `Morph.emes` tuple).
+
+    ISLE analyses do not mark their stems.  Morphemes outside the
+    `PREFIXES` and `SUFFIXES` inventories are stems (compounds have
+    several), as is a first morpheme that is not a known prefix; known
+    affixes before the first stem are prefixes, and the rest are suffixes
+    unless they are only known as prefixes.  If every morpheme is a known
+    affix, the longest (the first, on ties) is the stem.  So ``pay+ment``
+    is stem, suffix; ``un+do`` is prefix, stem; and ``dis+ability+s`` is
+    prefix, stem, suffix.
+    """
+    lowered = [eme.lower() for eme in emes]
+    stems = [i for i, eme in enumerate(lowered)
+             if eme not in PREFIXES and (i == 0 or eme not in SUFFIXES)]
+    if not stems:
+        stems = [max(range(len(emes)), key=lambda i: len(emes[i]))]
+    first = stems[0]
+    stems = frozenset(stems)
+    return tuple(
+        MorphRole.STEM if i in stems
+        else MorphRole.PREFIX if i < first or (eme in PREFIXES
+                                               and eme not in SUFFIXES)
+        else MorphRole.SUFFIX
+        for i, eme in enumerate(lowered))
+
+
+class MorphIndex(object):
+    """Inverted index from morphemes to the words whose analyses use them.
+
+    Morphemes are lowercased; each word is listed once per morpheme, in the
+    order words were added.  Words are added with `add`, so the index can
+    be filled in the same pass that loads them.  The per-`MorphRole`
+    postings are derived on the first query by role.
+    """
+
+    def __init__(self, words=()):
+        self._postings = {}  # eme -> [word]
+        self._roles = None  # role -> eme -> [word]
+        for w in words:
+            self.add(w)
+
+    def add(self, w):
+        postings = self._postings
+        for morph in w.morphs:
+            for eme in morph.emes:
+                words = postings.get(eme)
+                if words is None:
+                    words = postings.setdefault(eme.lower(), [])
+                if not words or words[-1] is not w:
+                    words.append(w)
+        self._roles = None
+
+    def _role_postings(self):
+        roles = dict((role, {}) for role in MorphRole)
+        for eme, words in self._postings.items():
+            for w in words:
+                for morph in w.morphs:
+                    for other, role in zip(morph.emes,
+                                           morph_roles(morph.emes)):
+                        if other.lower() != eme:
+                            continue
+                        found = roles[role].setdefault(eme, [])
+                        if not found or found[-1] is not w:
+                            found.append(w)
+        return roles
+
+    def __contains__(self, eme):
+        return eme.lower() in self._postings
+
+    def __iter__(self):
+        return iter(self._postings)
+
+    def __len__(self):
+        return len(self._postings)
+
+    def words(self, eme, role=None):
+        """Words with `eme` in one of their analyses, in the `MorphRole`
+        `role` if given.
+        """
+        if role is None:
+            postings = self._postings
+        else:
+            if self._roles is None:
+                self._roles = self._role_postings()
+            postings = self._roles[role]
+        return list(postings.get(eme.lower(), ()))
+
+    def derivations(self, stem):
+        """Words built on `stem`, e.g. ``derivations("abandon")``."""
+        return self.words(stem, MorphRole.STEM)
+
+    def suffixed(self, suffix):
+        """Words with the suffix `suffix`, e.g. ``suffixed("ment")``."""
+        return self.words(suffix, MorphRole.SUFFIX)
+
+    def prefixed(self, prefix):
+        """Words with the prefix `prefix`, e.g. ``prefixed("dis")``."""
+        return self.words(prefix, MorphRole.PREFIX)
+
+
+_NONZERO_BYTE = re.compile(b'[^\x00]')
+_BYTE_BITS = tuple(tuple(i for i in range(8) if b >> i & 1)
+                   for b in range(256))
+
+
+def _bitmap(ids, size):
+    """Python int with bit ``i`` set for each ``i`` in `ids`."""
+    buf = bytearray((size + 7) // 8)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, 'little')
+
+
+def _bitmap_ids(bits):
+    """The set bits of `bits`, in increasing order."""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    for m in _NONZERO_BYTE.finditer(data):
+        base = m.start() * 8
+        for b in _BYTE_BITS[data[m.start()]]:
+            yield base + b
+
+
+class PosIndex(object):
+    """Bitmap index from `PosCategory` and `EntityCategory` to words.
+
+    Word ids are positions in `words`.  Each category's bitmap is a Python
+    int with bit ``i`` set if word ``i`` has that category in any of its
+    `Pos` tags, so a query is a handful of big-integer operations, and the
+    matching words are found by skipping zero bytes.
+    """
+
+    def __init__(self, words):
+        self.words = list(words)
+        ids = {}
+        for i, w in enumerate(self.words):
+            for pos in w.pos:
+                ids.setdefault(pos.category, []).append(i)
+                if pos.entity_type is not None:
+                    ids.setdefault(pos.entity_type, []).append(i)
+        size = len(self.words)
+        self._all = (1 << size) - 1
+        self._bitmaps = dict((category, _bitmap(category_ids, size))
+                             for category, category_ids in ids.items())
+
+    def __len__(self):
+        return len(self.words)
+
+    def bitmap(self, category):
+        """The bitmap of a `PosCategory` or `EntityCategory`."""
+        return self._bitmaps.get(category, 0)
+
+    def query(self, all_of=(), any_of=(), none_of=()):
+        """Bitmap of the words with every category in `all_of`, at least
+        one in `any_of` (unless empty) and none in `none_of`.
+
+        For example, ``query(all_of=[PosCategory.NNP,
+        EntityCategory.COUNTRY], none_of=[PosCategory.NN])``.
+        """
+        bits = self._all
+        for category in all_of:
+            bits &= self.bitmap(category)
+        if any_of:
+            either = 0
+            for category in any_of:
+                either |= self.bitmap(category)
+            bits &= either
+        for category in none_of:
+            bits &= ~self.bitmap(category)
+        return bits
+
+    def ids(self, all_of=(), any_of=(), none_of=()):
+        """Sorted word ids matching `query`."""
+        return list(_bitmap_ids(self.query(all_of, any_of, none_of)))
+
+    def select(self, all_of=(), any_of=(), none_of=()):
+        """Words matching `query`, in index order."""
+        words = self.words
+        return [words[i] for i in
+                _bitmap_ids(self.query(all_of, any_of, none_of))]
+
+    def count(self, all_of=(), any_of=(), none_of=()):
+        """Number of words matching `query`."""
+        return bin(self.query(all_of, any_of, none_of)).count('1')
+
+
+class StressIndex(object):
+    """Index from `Pron.stress_pattern` strings (``u'010'``) to words.
+
+    Each word is listed once per distinct pattern among its prons, in the
+    order words were given.  There are few distinct patterns, so queries
+    over patterns (`match`, `stressed_on`) just scan them.
+    """
+
+    def __init__(self, words):
+        self._postings = {}  # pattern -> [word]
+        for w in words:
+            for pron in w.prons:
+                found = self._postings.setdefault(pron.stress_pattern, [])
+                if not found or found[-1] is not w:
+                    found.append(w)
+
+    def __contains__(self, pattern):
+        return pattern in self._postings
+
+    def __iter__(self):
+        return iter(self._postings)
+
+    def __len__(self):
+        return len(self._postings)
+
+    def words(self, pattern):
+        """Words with a pron stressed exactly as `pattern`, e.g. ``"010"``."""
+        return list(self._postings.get(pattern, ()))
+
+    def _select(self, keep):
+        seen = set()
+        result = []
+        for pattern, words in self._postings.items():
+            if not keep(pattern):
+                continue
+            for w in words:
+                if id(w) not in seen:
+                    seen.add(id(w))
+                    result.append(w)
+        return result
+
+    def match(self, pattern):
+        """Words with a pron whose pattern matches the glob `pattern`:
+        ``?`` stands for any one syllable, ``*`` for any number of them.
+        For example, ``match("1??")`` finds three-syllable words stressed
+        initially.
+        """
+        regex = re.compile(u''.join(
+            u'.*' if piece == u'*' else u'.' if piece == u'?'
+            else re.escape(piece) for piece in _WILDCARDS.split(pattern)))
+        return self._select(regex.fullmatch)
+
+    def stressed_on(self, syllable, syllables=None):
+        """Words with a pron whose primary stress falls on syllable number
+        `syllable` (from 0; negative counts from the end), of `syllables`
+        syllables if given.
+        """
+        def keep(pattern):
+            if syllables is not None and len(pattern) != syllables:
+                return False
+            return (-len(pattern) <= syllable < len(pattern)
+                    and pattern[syllable] == u'1')
+        return self._select(keep)
@@ -3,61 +3,457 @@
 from __future__ import print_function
 
 import collections
+import contextlib
+import enum
+import hashlib
+import io
+import logging
 import os.path
+import sys
+import threading
+import time
 
+import attr
 from six import text_type as unicode
+from six.moves import collections_abc
 
-from islex.tokens import Word, PosCategory
+from islex import __version__
+from islex.cache import BuildCache
+from islex.tokens import Word, LazyWord, ParseErrorKind, PosCategory
 
-ISLE_FILE = '/opt/data/ISLEdict.txt'
+# argparse, asyncio, concurrent.futures, json, pkg_resources and the index
+# modules are imported where they are used, so that ``import islex.load``
+# stays cheap for short-lived processes.
 
-# TODO(jkahn): this is obviously only going to work for me.
-CHECKOUT_ROOT = '/home/jeremy/src'
+logger = logging.getLogger(__name__)
 
+PACKAGE_STEMS = ('core', 'entities', 'periphery')
 
-def _open_data_package_target(stem):
+_ENTITY_CATEGORIES = (PosCategory.ABBREVIATION, PosCategory.NNP,
+                      PosCategory.NNPS)
+
+
+def _package_entries_path(checkout_root, stem):
     islex_path = 'islex-%s' % stem
-    package_dir = os.path.join(CHECKOUT_ROOT, islex_path, islex_path)
+    return os.path.join(checkout_root, islex_path, islex_path, 'entries.txt')
+
+
+@contextlib.contextmanager
+def _open_data_package_target(checkout_root, stem):
+    # Written to a temporary file and moved into place on success, so a
+    # failed build leaves the previous package intact.
+    f = _package_entries_path(checkout_root, stem)
+    package_dir = os.path.dirname(f)
     if not os.path.exists(package_dir):
         os.makedirs(package_dir)
-    f = os.path.join(package_dir, 'entries.txt')
-    return open(f, mode='w')
+    tmp_path = f + '.tmp'
+    try:
+        with io.open(tmp_path, mode='w', encoding='utf-8', newline='\n',
+                     buffering=1 << 20) as out:
+            yield out
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, f)
 
 
-def write_package_data():
-    core = _open_data_package_target('core')
-    entities = _open_data_package_target('entities')
-    periphery = _open_data_package_target('periphery')
+def package_for(w):
+    """Which data package (one of `PACKAGE_STEMS`) the word belongs in."""
+    if not len(w.pos) and not len(w.morphs):
+        return 'periphery'
+    if all(pos.category in _ENTITY_CATEGORIES for pos in w.pos):
+        return 'entities'
+    # Some entities with other tags will end up in core.
+    return 'core'
 
-    def is_unambiguous_entity(w):
-        ENTITY_CATEGORIES = (PosCategory.ABBREVIATION, PosCategory.NNP,
-                             PosCategory.NNPS)
-        return all(pos.category in ENTITY_CATEGORIES for pos in w.pos)
 
-    for w in stream_from_fh(open(ISLE_FILE, mode='r'), clean=True):
-        if not len(w.pos) and not len(w.morphs):
-            out = periphery
-        elif is_unambiguous_entity(w):
-            out = entities
+def build_package_data(isle_file, checkout_root, workers=1,
+                       batch_lines=10000, progress=None, progress_every=50000,
+                       errors=None):
+    """Split the ISLE dictionary into the core, entities and periphery data
+    packages under `checkout_root`.
+
+    Lines are written in batches of `batch_lines` per package.  With
+    `workers` above 1 the file is parsed by `stream_from_path_parallel`.
+    `progress`, if given, is called as ``progress(words, seconds)`` every
+    `progress_every` words and once at the end.  Bad lines go to `errors`
+    (`log_bad_line` by default).  The packages are only replaced once the
+    whole file has been read, so a failed build leaves the previous ones in
+    place.  Returns the number of words written to each package.
+    """
+    errors = errors or log_bad_line
+    counts = dict((stem, 0) for stem in PACKAGE_STEMS)
+    pending = dict((stem, []) for stem in PACKAGE_STEMS)
+    start = time.time()
+    n = 0
+    with contextlib.ExitStack() as stack:
+        if workers > 1:
+            words = stream_from_path_parallel(isle_file, clean=True,
+                                              workers=workers, errors=errors)
+            stack.callback(words.close)
         else:
-            # Some entities with other tags will end up in core.
-            out = core
-        out.write(w.to_string().encode('utf-8') + "\n")
+            fh = stack.enter_context(io.open(isle_file, mode='rb'))
+            words = stream_from_fh(fh, clean=True, errors=errors)
+        outputs = dict(
+            (stem, stack.enter_context(
+                _open_data_package_target(checkout_root, stem)))
+            for stem in PACKAGE_STEMS)
+        for w in words:
+            stem = package_for(w)
+            batch = pending[stem]
+            batch.append(w.to_string())
+            batch.append(u'\n')
+            if len(batch) >= 2 * batch_lines:
+                outputs[stem].writelines(batch)
+                del batch[:]
+            counts[stem] += 1
+            n += 1
+            if progress is not None and not n % progress_every:
+                progress(n, time.time() - start)
+        for stem, batch in pending.items():
+            outputs[stem].writelines(batch)
+    if progress is not None:
+        progress(n, time.time() - start)
+    return counts
+
+
+MANIFEST_NAME = '.islex-manifest.json'
+
 
+def _line_hash(raw):
+    return hashlib.blake2b(raw.rstrip(b'\r\n'), digest_size=8).hexdigest()
 
-def stream_from_fh(fh, clean=False):
-    for ln in fh:
-        ln = ln.decode('utf-8')
+
+def _read_manifest(checkout_root):
+    """Return ``(known, packages)`` from the last `update_package_data` run.
+
+    `known` maps source line hashes to ``(stem, output line)``, or to
+    ``(None, None)`` for lines that failed to parse; `packages` maps each
+    stem to its list of line hashes.  Both are empty if there is no usable
+    manifest (missing, from another islex version, or its outputs changed).
+    """
+    import json
+    try:
+        with io.open(os.path.join(checkout_root, MANIFEST_NAME),
+                     encoding='utf-8') as fh:
+            manifest = json.load(fh)
+    except (IOError, ValueError):
+        return {}, {}
+    if manifest.get('version') != __version__:
+        return {}, {}
+    known = dict((h, (None, None)) for h in manifest.get('skipped', ()))
+    packages = {}
+    for stem, hashes in manifest.get('packages', {}).items():
         try:
-            yield Word.from_string(unicode(ln), clean=clean)
+            with io.open(_package_entries_path(checkout_root, stem),
+                         encoding='utf-8') as fh:
+                lines = fh.read().splitlines()
+        except IOError:
+            continue
+        if len(lines) != len(hashes):
+            continue
+        packages[stem] = hashes
+        known.update(zip(hashes, ((stem, ln) for ln in lines)))
+    return known, packages
+
+
+def update_package_data(isle_file, checkout_root, progress=None,
+                        progress_every=50000, errors=None):
+    """Incremental `build_package_data`.
+
+    A manifest of per-line content hashes is kept in `checkout_root`; only
+    source lines not seen in the previous run are parsed, and only packages
+    whose contents changed are rewritten.  The first run (or one after an
+    islex upgrade) parses everything.  Returns a dict with the words per
+    package and the ``reparsed``, ``reused`` and ``rewritten`` (package
+    stems) results, so callers can rebuild only the indexes that changed.
+    """
+    import json
+    errors = errors or log_bad_line
+    known, old_packages = _read_manifest(checkout_root)
+    lines = dict((stem, []) for stem in PACKAGE_STEMS)
+    hashes = dict((stem, []) for stem in PACKAGE_STEMS)
+    skipped = []
+    reparsed = reused = n = 0
+    start = time.time()
+    with io.open(isle_file, mode='rb') as fh:
+        for lineno, raw in enumerate(fh, 1):
+            h = _line_hash(raw)
+            if h in known:
+                stem, text = known[h]
+                reused += 1
+            else:
+                reparsed += 1
+                try:
+                    w = Word.from_string_fast(raw.decode('utf-8'), clean=True)
+                except ValueError as v:
+                    errors(BadLine.from_error(lineno, v))
+                    stem, text = None, None
+                else:
+                    stem, text = package_for(w), w.to_string()
+                known[h] = (stem, text)
+            if stem is None:
+                skipped.append(h)
+                continue
+            lines[stem].append(text)
+            hashes[stem].append(h)
+            n += 1
+            if progress is not None and not n % progress_every:
+                progress(n, time.time() - start)
+
+    rewritten = []
+    for stem in PACKAGE_STEMS:
+        if hashes[stem] == old_packages.get(stem):
+            continue
+        with _open_data_package_target(checkout_root, stem) as out:
+            out.writelines(ln + u'\n' for ln in lines[stem])
+        rewritten.append(stem)
+    with io.open(os.path.join(checkout_root, MANIFEST_NAME), mode='w',
+                 encoding='utf-8') as out:
+        out.write(unicode(json.dumps({'version': __version__,
+                                      'packages': hashes,
+                                      'skipped': sorted(set(skipped))})))
+    if progress is not None:
+        progress(n, time.time() - start)
+    result = dict((stem, len(lines[stem])) for stem in PACKAGE_STEMS)
+    result.update(reparsed=reparsed, reused=reused, rewritten=rewritten)
+    return result
+
+
+def _report_progress(words, seconds):
+    print("%d words in %.1fs (%.0f words/s)"
+          % (words, seconds, words / max(seconds, 1e-9)), file=sys.stderr)
+
+
+def write_package_data(argv=None):
+    """Entry point for ``islex-write-package``."""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog='islex-write-package',
+        description="Split the ISLE dictionary into islex data packages.")
+    parser.add_argument('--isle-file', required=True,
+                        help="ISLE dictionary to read")
+    parser.add_argument('--checkout-root', required=True,
+                        help="directory holding the islex-<stem> package "
+                        "checkouts")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="parse in this many processes (default: 1)")
+    parser.add_argument('--batch-lines', type=int, default=10000,
+                        help="lines buffered per package between writes")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only reparse lines changed since the last "
+                        "--incremental run, and only rewrite changed "
+                        "packages (ignores --workers)")
+    parser.add_argument('--quiet', action='store_true',
+                        help="don't report progress on stderr")
+    args = parser.parse_args(argv)
+    progress = None if args.quiet else _report_progress
+    if args.incremental:
+        counts = update_package_data(args.isle_file, args.checkout_root,
+                                     progress=progress)
+    else:
+        counts = build_package_data(
+            args.isle_file, args.checkout_root, workers=args.workers,
+            batch_lines=args.batch_lines, progress=progress)
+    if not args.quiet:
+        if args.incremental:
+            print("%(reparsed)d lines reparsed, %(reused)d reused" % counts,
+                  file=sys.stderr)
+        for stem in PACKAGE_STEMS:
+            print("islex-%s: %d words" % (stem, counts[stem]),
+                  file=sys.stderr)
+
+
+STAGES = ('decode', 'parse')
+
+
+@attr.s(slots=True, frozen=True)
+class BadLine(object):
+    """A line `stream_from_fh` could not parse."""
+    lineno = attr.ib()
+    kind = attr.ib()  # ParseErrorKind
+    message = attr.ib()
+
+    @classmethod
+    def from_error(cls, lineno, error):
+        if isinstance(error, UnicodeDecodeError):
+            kind = ParseErrorKind.BAD_ENCODING
+        else:
+            kind = getattr(error, 'kind', ParseErrorKind.INVALID)
+        return cls(lineno=lineno, kind=kind, message=unicode(error))
+
+
+def log_bad_line(bad):
+    """Default error sink: a warning on the ``islex.load`` logger."""
+    logger.warning("line %d: %s", bad.lineno, bad.message)
+
+
+@attr.s
+class StreamStats(object):
+    """Load health counters, filled in by `stream_from_fh`.
+
+    `errors` counts bad lines by `ParseErrorKind` and `error_lines` lists
+    their line numbers per kind; `seconds` is time spent in each of the
+    `STAGES` (summed over workers for `stream_from_path_parallel`).
+    """
+    lines = attr.ib(default=0)
+    words = attr.ib(default=0)
+    errors = attr.ib(default=attr.Factory(collections.Counter))
+    error_lines = attr.ib(default=attr.Factory(dict))
+    seconds = attr.ib(default=attr.Factory(collections.Counter))
+
+    def add_error(self, bad):
+        self.errors[bad.kind] += 1
+        self.error_lines.setdefault(bad.kind, []).append(bad.lineno)
+
+    def merge(self, other):
+        """Add the counts of `other` into this one."""
+        self.lines += other.lines
+        self.words += other.words
+        self.errors.update(other.errors)
+        for kind, linenos in other.error_lines.items():
+            self.error_lines.setdefault(kind, []).extend(linenos)
+        self.seconds.update(other.seconds)
+
+
+def stream_from_fh(fh, clean=False, lazy=False, errors=log_bad_line,
+                   stats=None, first_line=1):
+    """Parse the ISLE lines (bytes) of `fh` into `Word` objects.
+
+    With `lazy`, yield `LazyWord` objects instead.  Malformed lines are
+    skipped and a `BadLine` for each is passed to `errors`; `first_line` is
+    the number given to the first line.  If a `StreamStats` is passed as
+    `stats`, it is kept up to date as lines are read, and per-stage times
+    are measured.
+    """
+    parse = LazyWord.from_string if lazy else Word.from_string_fast
+    if stats is not None:
+        return _timed_stream(fh, parse, clean, errors, stats, first_line)
+    return _stream(fh, parse, clean, errors, first_line)
+
+
+def _stream(fh, parse, clean, errors, first_line):
+    for lineno, ln in enumerate(fh, first_line):
+        try:
+            yield parse(ln.decode('utf-8'), clean=clean)
         except ValueError as v:
-            print(unicode(v).encode('utf-8'))
+            errors(BadLine.from_error(lineno, v))
+
+
+def _timed_stream(fh, parse, clean, errors, stats, first_line):
+    clock = time.perf_counter
+    seconds = stats.seconds
+    for lineno, ln in enumerate(fh, first_line):
+        stats.lines += 1
+        try:
+            start = clock()
+            ln = ln.decode('utf-8')
+            decoded = clock()
+            w = parse(ln, clean=clean)
+            seconds['parse'] += clock() - decoded
+            seconds['decode'] += decoded - start
+        except ValueError as v:
+            bad = BadLine.from_error(lineno, v)
+            stats.add_error(bad)
+            errors(bad)
             continue
+        stats.words += 1
+        yield w
+
 
+def _chunk_ranges(path, chunk_bytes):
+    """Split the file at `path` into ``(start, end, first line number)``
+    byte ranges ending on line boundaries.
+    """
+    ranges = []
+    with open(path, mode='rb') as fh:
+        start = 0
+        lineno = 1
+        while True:
+            data = fh.read(chunk_bytes) + fh.readline()
+            if not data:
+                break
+            end = start + len(data)
+            ranges.append((start, end, lineno))
+            lineno += data.count(b'\n')
+            start = end
+    return ranges
 
-class ReadOnlyMapping(collections.Mapping):
+
+def _parse_chunk(path, start, end, first_line, clean):
+    """Parse one chunk in a worker; returns words, bad lines and stats."""
+    with open(path, mode='rb') as fh:
+        fh.seek(start)
+        lines = fh.read(end - start).splitlines(True)
+    bad_lines = []
+    stats = StreamStats()
+    words = list(stream_from_fh(lines, clean=clean, errors=bad_lines.append,
+                                stats=stats, first_line=first_line))
+    return words, bad_lines, stats
+
+
+def stream_from_path_parallel(path, clean=False, workers=None, ordered=True,
+                              chunk_bytes=1 << 20, errors=log_bad_line,
+                              stats=None):
+    """Parse the ISLE file at `path` in a pool of worker processes.
+
+    The file is cut into chunks of roughly `chunk_bytes` on line boundaries
+    and each chunk is parsed by `stream_from_fh` in a worker.  Words are
+    yielded in file order unless `ordered` is false, in which case each
+    chunk's words are yielded as soon as that chunk is done.  `workers`
+    defaults to the number of CPUs.  `errors` and `stats` are as for
+    `stream_from_fh`, and are called or updated in this process as each
+    chunk is yielded.
+
+    At most two chunks per worker are in flight at a time, so memory stays
+    bounded however far the consumer lags; closing the generator early
+    cancels the chunks not yet started.
+    """
+    from concurrent import futures
+    workers = workers or os.cpu_count() or 1
+    ranges = iter(_chunk_ranges(path, chunk_bytes))
+    pool = futures.ProcessPoolExecutor(max_workers=workers)
+    in_flight = collections.deque()
+
+    def submit():
+        chunk = next(ranges, None)
+        if chunk is not None:
+            in_flight.append(pool.submit(_parse_chunk, path, *chunk,
+                                         clean=clean))
+
+    try:
+        for _ in range(2 * workers):
+            submit()
+        while in_flight:
+            if ordered:
+                job = in_flight.popleft()
+            else:
+                futures.wait(in_flight, return_when=futures.FIRST_COMPLETED)
+                job = next(j for j in in_flight if j.done())
+                in_flight.remove(job)
+            words, bad_lines, chunk_stats = job.result()
+            del job
+            submit()
+            for bad in bad_lines:
+                errors(bad)
+            if stats is not None:
+                stats.merge(chunk_stats)
+            for w in words:
+                yield w
+            del words
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def entries_fh(module):
+    """Open the raw ``entries.txt`` resource of a data package module."""
+    from pkg_resources import resource_stream
+    return resource_stream(module.__name__, 'entries.txt')
+
+
+class ReadOnlyMapping(collections_abc.Mapping):
     def __init__(self, backing_store):
-        assert isinstance(backing_store, collections.Mapping)
+        assert isinstance(backing_store, collections_abc.Mapping)
         self._store = backing_store
 
     def __getitem__(self, key):
@@ -75,17 +471,312 @@ class CaseInsensitiveMapping(ReadOnlyMapping):
     def __getitem__(self, key):
         return self._store[key.lower()]
 
+    def lookup_many(self, tokens):
+        """Look up a batch of tokens (e.g. running text) in one call.
+
+        Each distinct token is lowercased and looked up once.  Returns
+        ``(hits, oov)``: a dict from each token found to its entries, and a
+        list of the tokens not found, in first-seen order.
+        """
+        get = self._store.get
+        hits = {}
+        oov = []
+        for token in dict.fromkeys(tokens):
+            words = get(token.lower())
+            if words is None:
+                oov.append(token)
+            else:
+                hits[token] = words
+        return hits, oov
+
+
+# Every mapping and index built from a data package, keyed by
+# (kind, module, options...).  Set CACHE.max_entries or CACHE.max_bytes to
+# bound it; see `islex.cache.BuildCache`.
+CACHE = BuildCache()
+
+
+def invalidate(module):
+    """Drop every cached mapping and index built from `module`."""
+    CACHE.invalidate_where(lambda key: key[1] is module or (
+        isinstance(key[1], tuple) and module in key[1]))
+
+
+def _ortho_words(module, lazy):
+    if lazy:
+        return _lazy_words(module)
+    return module.entries_stream()
+
+
+def _lazy_words(module):
+    with entries_fh(module) as fh:
+        for w in stream_from_fh(fh, lazy=True):
+            yield w
+
+
+def _add_word(d, w):
+    # A new list is built and then stored, never grown in place, so a
+    # reader of a `BackgroundMapping` that is still loading sees either the
+    # old entry or the complete new one.
+    orth = w.ortho.lower()
+    d[orth] = d.get(orth, []) + [w]
+
+
+def _build_ortho_mapping(module, lazy):
+    from islex.index import MorphIndex
+    d = dict()
+    morphs = MorphIndex()
+    for w in _ortho_words(module, lazy):
+        _add_word(d, w)
+        morphs.add(w)
+    return CaseInsensitiveMapping(backing_store=d), morphs
+
+
+def ortho_mapping(module, lazy=False):
+    """Case-insensitive mapping from ortho to the list of its `Word` entries.
+
+    With `lazy`, entries are `LazyWord` objects read straight from the data
+    package's ``entries.txt``, and prons are parsed on first use.
+    """
+    morphs = []
+
+    def build():
+        mapping, morph_index = _build_ortho_mapping(module, lazy)
+        morphs.append(morph_index)
+        return mapping
+    mapping = CACHE.get(('ortho', module, lazy), build)
+    if morphs:
+        # The morpheme index comes out of the same pass.  It is cached only
+        # now, outside the ortho build: a build must never wait on another
+        # key, or it can deadlock against a caller holding that key.
+        CACHE.get(('morph', module, lazy), lambda: morphs[0])
+    return mapping
+
+
+@enum.unique
+class MergePolicy(enum.Enum):
+    """How `LayeredMapping` combines the entries of an ortho found in more
+    than one layer.
+    """
+    FIRST_WINS = 1  # only the entries of the first layer that has it
+    UNION = 2  # the entries of every layer, in layer order
+
+
+class LayeredMapping(CaseInsensitiveMapping):
+    """One case-insensitive mapping over several ortho mappings (layers),
+    earlier layers taking precedence.
+
+    The layers' key index is merged once into a single dict, so a lookup
+    is one dict lookup however many layers there are.  Its keys and entry
+    lists are the layers' own objects; only orthos merged under
+    `MergePolicy.UNION` get a new list.
+    """
+
+    def __init__(self, layers, merge=MergePolicy.FIRST_WINS):
+        stores = [layer._store for layer in layers]
+        if merge is MergePolicy.FIRST_WINS:
+            d = {}
+            for store in reversed(stores):
+                d.update(store)
+        else:
+            d = dict(stores[0]) if stores else {}
+            merged = set()
+            for store in stores[1:]:
+                for orth, words in store.items():
+                    found = d.get(orth)
+                    if found is None:
+                        d[orth] = words
+                    elif orth in merged:
+                        found.extend(words)
+                    else:
+                        d[orth] = found + words
+                        merged.add(orth)
+        super(LayeredMapping, self).__init__(backing_store=d)
+        self.merge = merge
+
+
+def layered_mapping(modules, merge=MergePolicy.FIRST_WINS, lazy=False):
+    """`LayeredMapping` over the `ortho_mapping` of each data package in
+    `modules`, in order of precedence, e.g. ``[islex_core, islex_entities,
+    islex_periphery]``.
+    """
+    modules = tuple(modules)
+    layers = [ortho_mapping(m, lazy) for m in modules]
+    return CACHE.get(('layered', modules, merge, lazy),
+                     lambda: LayeredMapping(layers, merge))
+
+
+def shared_ortho_mapping(module, path):
+    """`ortho_mapping(module)` as a `CompiledMapping` over the index file at
+    `path`, compiled by whichever process gets there first and memory-mapped
+    by all of them; see `islex.compiled.shared_mapping`.
+    """
+    from islex.compiled import shared_mapping
+    return CACHE.get(('shared', module, path),
+                     lambda: shared_mapping(path, module.entries_stream))
+
+
+class BackgroundMapping(CaseInsensitiveMapping):
+    """An `ortho_mapping` that is still being filled by a background thread.
+
+    Lookups answer from whatever has been loaded so far, so a `KeyError`
+    only means "not in the dictionary" once `ready` is true.  `loaded` counts
+    the words read so far.  Wait for completion with `wait`, or from asyncio
+    by awaiting the mapping itself (or `wait_async`).
+    """
+
+    def __init__(self):
+        super(BackgroundMapping, self).__init__(backing_store={})
+        self.loaded = 0
+        self.error = None
+        self._ready = threading.Event()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def wait(self, timeout=None):
+        """Block until loading is done (or `timeout` seconds pass) and return
+        `ready`.  Re-raises any error from the loading thread.
+        """
+        self._ready.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.ready
+
+    async def wait_async(self):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.wait)
+        return self
+
+    def __await__(self):
+        return self.wait_async().__await__()
+
+    def __iter__(self):
+        # Snapshot, since the loading thread may be adding keys.
+        return iter(list(self._store))
+
+    def _fill(self, words):
+        for w in words:
+            _add_word(self._store, w)
+            self.loaded += 1
+        return self
+
+    def _run(self, key, words):
+        try:
+            mapping = CACHE.get(key, lambda: self._fill(words()))
+            if mapping is not self:  # already loaded before we started
+                self._store = mapping._store
+                self.loaded = sum(len(ws) for ws in mapping._store.values())
+        except Exception as e:
+            self.error = e
+        finally:
+            self._ready.set()
+
+
+def ortho_mapping_background(module, lazy=False):
+    """Start loading `ortho_mapping(module, lazy)` in a daemon thread and
+    return a `BackgroundMapping` that serves lookups as entries arrive.
+
+    Once loaded, the mapping is the one `ortho_mapping` returns; callers of
+    `ortho_mapping` during loading wait for it rather than loading again.
+    """
+    mapping = BackgroundMapping()
+    thread = threading.Thread(
+        target=mapping._run,
+        args=(('ortho', module, lazy), lambda: _ortho_words(module, lazy)),
+        name='islex-load-%s' % module.__name__)
+    thread.daemon = True
+    thread.start()
+    return mapping
+
+
+# Derived indexes load `ortho_mapping` before asking the cache for their
+# own key, never from inside their build (see `ortho_mapping`).
+
+def _loaded_words(mapping):
+    return (w for ws in mapping.values() for w in ws)
+
+
+def pron_mapping(module, syllables=False, stress=True):
+    """`PronIndex` over every word in `module`, for homophone lookups.
+
+    Built from the words already loaded by `ortho_mapping`.
+    """
+    from islex.index import PronIndex
+    mapping = ortho_mapping(module)
+    return CACHE.get(('pron', module, syllables, stress),
+                     lambda: PronIndex(_loaded_words(mapping),
+                                       syllables=syllables, stress=stress))
+
+
+def rhyme_mapping(module):
+    """`RhymeIndex` over every word in `module`."""
+    from islex.index import RhymeIndex
+    mapping = ortho_mapping(module)
+    return CACHE.get(('rhyme', module),
+                     lambda: RhymeIndex(_loaded_words(mapping)))
+
+
+def phone_ngram_index(module, max_n=3):
+    """`PhoneNgramIndex` over every word in `module`."""
+    from islex.index import PhoneNgramIndex
+    mapping = ortho_mapping(module)
+    return CACHE.get(('ngram', module, max_n),
+                     lambda: PhoneNgramIndex(_loaded_words(mapping),
+                                             max_n=max_n))
+
+
+def pron_neighbors(module, stress=True):
+    """`PronNeighbors` over every word in `module`, for finding the closest
+    dictionary pronunciations to an out-of-vocabulary phone string.
+    """
+    from islex.nearest import PronNeighbors
+    mapping = ortho_mapping(module)
+    return CACHE.get(('neighbors', module, stress),
+                     lambda: PronNeighbors(_loaded_words(mapping),
+                                           stress=stress))
+
+
+def pos_index(module):
+    """`PosIndex` over every word in `module`, for filtering by
+    `PosCategory` and `EntityCategory`.
+    """
+    from islex.index import PosIndex
+    mapping = ortho_mapping(module)
+    return CACHE.get(('pos', module),
+                     lambda: PosIndex(_loaded_words(mapping)))
+
+
+def stress_index(module):
+    """`StressIndex` over every word in `module`, for finding words by
+    `Pron.stress_pattern`.
+    """
+    from islex.index import StressIndex
+    mapping = ortho_mapping(module)
+    return CACHE.get(('stress', module),
+                     lambda: StressIndex(_loaded_words(mapping)))
+
+
+def morph_index(module, lazy=False):
+    """`MorphIndex` over every word in `module`, for finding the words built
+    on a morpheme.
 
-MEMOIZED_MAPPINGS = {}
+    It is filled in the same pass that builds `ortho_mapping`, or from the
+    loaded mapping if it was dropped from the cache or loaded in the
+    background.
+    """
+    from islex.index import MorphIndex
+    mapping = ortho_mapping(module, lazy)
+    return CACHE.get(('morph', module, lazy),
+                     lambda: MorphIndex(_loaded_words(mapping)))
 
 
-def ortho_mapping(module):
-    if module not in MEMOIZED_MAPPINGS:
-        d = dict()
-        for w in module.entries_stream():
-            orth = w.ortho.lower()
-            if orth not in d:
-                d[orth] = []
-                d[orth].append(w)
-        MEMOIZED_MAPPINGS[module] = CaseInsensitiveMapping(backing_store=d)
-    return MEMOIZED_MAPPINGS[module]
+def ortho_search(module):
+    """`OrthoSearch` over the orthos of `module`, for prefix and glob
+    queries; look the results up in `ortho_mapping` for their words.
+    """
+    from islex.index import OrthoSearch
+    mapping = ortho_mapping(module)
+    return CACHE.get(('search', module), lambda: OrthoSearch(mapping))
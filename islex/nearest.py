@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""Approximate pronunciation matching: nearest dictionary prons to a phone
+string, by phone edit distance.
+
+Prons are encoded as tuples of integer phone ids and stored in a BK-tree,
+a metric tree that lets a query skip every subtree whose distance bound
+rules it out.
+"""
+
+import heapq
+
+from six import string_types
+
+from islex.index import strip_stress
+
+
+def _match_masks(a):
+    """Bit mask of the positions of each symbol in `a`."""
+    masks = {}
+    bit = 1
+    for x in a:
+        masks[x] = masks.get(x, 0) | bit
+        bit <<= 1
+    return masks
+
+
+def _distance(masks, m, b):
+    """Levenshtein distance between a length-`m` sequence, given by its
+    `_match_masks`, and `b`, using Myers' bit-parallel algorithm: one pass
+    over `b` with a handful of integer operations per symbol.
+    """
+    if not m:
+        return len(b)
+    full = (1 << m) - 1
+    high = 1 << (m - 1)
+    vp = full
+    vn = 0
+    score = m
+    for y in b:
+        eq = masks.get(y, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        hp = vn | (~(xh | vp) & full)
+        hn = vp & xh
+        if hp & high:
+            score += 1
+        elif hn & high:
+            score -= 1
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = hn | (~(xv | hp) & full)
+        vn = hp & xv
+    return score
+
+
+def edit_distance(a, b):
+    """Levenshtein distance between the sequences `a` and `b`."""
+    return _distance(_match_masks(a), len(a), b)
+
+
+class _Node(object):
+    __slots__ = ('seq', 'entries', 'children')
+
+    def __init__(self, seq):
+        self.seq = seq
+        self.entries = []  # ordinals into PronNeighbors._entries
+        self.children = {}  # distance -> _Node
+
+
+class PronNeighbors(object):
+    """Nearest-neighbour search over the prons of `words`.
+
+    Results are ``(distance, word, pron)`` triples, ordered by distance and
+    then by the order the words were given in.  Stress marks count towards
+    the distance unless `stress` is false.
+    """
+
+    def __init__(self, words, stress=True):
+        self.stress = stress
+        self._phone_ids = {}
+        self._entries = []  # (word, pron, encoded)
+        self._root = None
+        nodes = {}
+        for w in words:
+            for pron in w.prons:
+                seq = self._encode(pron, grow=True)
+                node = nodes.get(seq)
+                if node is None:
+                    node = nodes[seq] = self._insert(seq)
+                node.entries.append(len(self._entries))
+                self._entries.append((w, pron, seq))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _encode(self, pron, grow=False):
+        if isinstance(pron, string_types):
+            phones = tuple(p for p in pron.split() if p != u'.')
+        elif isinstance(pron, (tuple, list)):
+            phones = tuple(pron)
+        else:
+            phones = pron.ipa
+        if not self.stress:
+            phones = tuple(strip_stress(p) for p in phones)
+        ids = self._phone_ids
+        if grow:
+            return tuple(ids.setdefault(p, len(ids)) for p in phones)
+        # Phones not in the dictionary never match, so -1 is safe for all.
+        return tuple(ids.get(p, -1) for p in phones)
+
+    def _insert(self, seq):
+        node = _Node(seq)
+        if self._root is None:
+            self._root = node
+            return node
+        masks = _match_masks(seq)
+        parent = self._root
+        while True:
+            d = _distance(masks, len(seq), parent.seq)
+            child = parent.children.get(d)
+            if child is None:
+                parent.children[d] = node
+                return node
+            parent = child
+
+    def _results(self, best):
+        return [(d, self._entries[n][0], self._entries[n][1])
+                for d, n in sorted(best)]
+
+    def nearest(self, pron, k=5, max_distance=None):
+        """The `k` entries closest to `pron` (a `Pron`, an ISLE pron string or
+        a tuple of phones), no further away than `max_distance`.
+        """
+        if k < 1:
+            return []
+        query = self._encode(pron)
+        masks = _match_masks(query)
+        m = len(query)
+        radius = float('inf') if max_distance is None else max_distance
+        best = []  # max-heap of (-distance, -ordinal)
+        # Best-first walk: each queued node carries a lower bound on the
+        # distance of everything below it, from the triangle inequality.
+        queue = [(0, 0, self._root)] if self._root is not None else []
+        pushed = 1
+        while queue:
+            bound, _, node = heapq.heappop(queue)
+            if bound > radius:
+                break
+            d = _distance(masks, m, node.seq)
+            if d <= radius:
+                for n in node.entries:
+                    item = (-d, -n)
+                    if len(best) < k:
+                        heapq.heappush(best, item)
+                    elif item > best[0]:
+                        heapq.heapreplace(best, item)
+                if len(best) == k:
+                    radius = min(radius, -best[0][0])
+            for dist, child in node.children.items():
+                child_bound = max(bound, abs(dist - d))
+                if child_bound <= radius:
+                    heapq.heappush(queue, (child_bound, pushed, child))
+                    pushed += 1
+        return self._results((-d, -n) for d, n in best)
+
+    def scan(self, pron, k=5, max_distance=None):
+        """Exhaustive version of `nearest`, for checking and benchmarking."""
+        query = self._encode(pron)
+        masks = _match_masks(query)
+        scored = ((_distance(masks, len(query), seq), n)
+                  for n, (_, _, seq) in enumerate(self._entries))
+        if max_distance is not None:
+            scored = (item for item in scored if item[0] <= max_distance)
+        return self._results(heapq.nsmallest(k, scored))
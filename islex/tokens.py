@@ -6,6 +6,7 @@ import re
 from six import text_type as unicode
 import enum
 import itertools
+import weakref
 
 
 @enum.unique
@@ -85,6 +86,26 @@ class EntityCategory(enum.Enum):
     GIRLNAME = 14
 
 
+@enum.unique
+class ParseErrorKind(enum.Enum):
+    BAD_ENCODING = 'bad encoding'
+    TOO_FEW_SEGMENTS = 'too few segments'
+    BAD_ORTHO = 'bad ortho'
+    UNKNOWN_POS_TAG = 'unknown pos tag'
+    INVALID = 'invalid'  # any other ValueError, e.g. from a validator
+
+
+class ParseError(ValueError):
+    """A malformed ISLE line; `kind` is a `ParseErrorKind`."""
+
+    def __init__(self, kind, message):
+        super(ParseError, self).__init__(message)
+        self.kind = kind
+
+    def __reduce__(self):
+        return (type(self), (self.kind, self.args[0]))
+
+
 _scored_patt = re.compile(r'_\d\.\d+$')
 
 
@@ -113,7 +134,7 @@ def _clean_tag(t):
     return t
 
 
-@attr.s
+@attr.s(slots=True, frozen=True, cache_hash=True)
 class Pos(object):
     """Contains part of speech information and (possibly) entity category."""
     category = attr.ib(validator=instance_of(PosCategory))
@@ -142,8 +163,11 @@ class Pos(object):
             out += u'_' + self.entity_type.name.lower()
         return out
 
+    def __reduce__(self):
+        return (Pos, (self.category, self.entity_type))
+
 
-@attr.s
+@attr.s(slots=True, frozen=True, cache_hash=True)
 class Morph(object):
     """Contains a morphological analysis of the corresponding ortho.
 
@@ -159,41 +183,248 @@ class Morph(object):
     def to_string(self):
         return u'+' + u'+'.join(self.emes)
 
-
-@attr.s
+    def __reduce__(self):
+        return (Morph, (self.emes,))
+
+
+# Intern tables, keyed by the string each object was parsed from.  The
+# phone and syllable inventories are tiny compared to the number of times
+# they occur, so parsing shares one instance per distinct string.  Values
+# are held weakly: an interned object lives only as long as some word uses
+# it, so dropping a loaded mapping frees its phones and syllables too.
+# (Whole prons are not interned: nearly every entry has its own.)
+_PHONES = weakref.WeakValueDictionary()
+_SYLLABLES = weakref.WeakValueDictionary()
+# Raw POS tag string -> decoded Pos, for each value of `clean`, and the
+# distinct POS tuples, so that tag lists differing only in their morphs
+# (most of them) share one tuple; see islex.writer.  Morph tags are mostly
+# unique to one stem, so they are decoded every time.  Both tables are
+# bounded by the tag inventory, and capped at `_MAX_MEMO` entries in case
+# the input is stranger than ISLE.
+_TAGS = {False: {}, True: {}}
+_POS_TUPLES = {}
+_MAX_MEMO = 4096
+
+
+def intern_table_size():
+    """Return the number of interned phones, syllables and tags."""
+    return {'phones': len(_PHONES),
+            'syllables': len(_SYLLABLES),
+            'tags': sum(len(memo) for memo in _TAGS.values()),
+            'pos_tuples': len(_POS_TUPLES)}
+
+
+def clear_intern_tables():
+    """Forget all interned objects (existing references stay valid)."""
+    _PHONES.clear()
+    _SYLLABLES.clear()
+    _POS_TUPLES.clear()
+    for memo in _TAGS.values():
+        memo.clear()
+
+
+def _decode_tag(t, clean):
+    """Decode one raw tag as `Word.from_string` would; None if dropped."""
+    if clean:
+        t = _clean_tag(t)
+    if not t:
+        return None
+    if t.startswith('+'):
+        return Morph.from_string(t)
+    try:
+        return Pos.from_string(t)
+    except KeyError as k:
+        raise ParseError(ParseErrorKind.UNKNOWN_POS_TAG,
+                         "pos tag %s not found" % k)
+
+
+def _decode_tag_list(raw_pos, clean):
+    """Decode a comma-separated tag list into (pos, morphs) tuples."""
+    memo = _TAGS[clean]
+    all_morphs = []
+    all_pos = []
+    for t in raw_pos.split(u','):
+        tag = memo.get(t)
+        if tag is None:
+            tag = _decode_tag(t, clean)
+            if tag is None:
+                continue
+            if type(tag) is not Pos:
+                all_morphs.append(tag)
+                continue
+            if len(memo) < _MAX_MEMO:
+                memo[t] = tag
+        all_pos.append(tag)
+    all_pos = tuple(all_pos)
+    if len(_POS_TUPLES) < _MAX_MEMO:
+        all_pos = _POS_TUPLES.setdefault(all_pos, all_pos)
+    return all_pos, tuple(all_morphs)
+
+
+def _split_entry(s, clean):
+    """Split an ISLE line into ortho, (pos, morphs) tuples and raw prons."""
+    s = s.strip()
+    raw_prons = s.split(u'#')
+    while not raw_prons[-1]:
+        raw_prons.pop(-1)
+    if len(raw_prons) < 2:
+        raise ParseError(ParseErrorKind.TOO_FEW_SEGMENTS,
+                         "string doesn't have enough segments: %s" % s)
+    raw_ortho = raw_prons.pop(0)
+    key = raw_ortho.rstrip()
+    paren = raw_ortho.find(u'(')
+    if paren < 1 or len(key) - 1 <= paren or key[-1] != u')':
+        raise ParseError(ParseErrorKind.BAD_ORTHO,
+                         "ortho doesn't match expected: %s" % raw_ortho)
+    all_pos, all_morphs = _decode_tag_list(key[paren + 1:-1], clean)
+    return raw_ortho[:paren], all_pos, all_morphs, raw_prons
+
+
+@attr.s(slots=True, frozen=True, cache_hash=True, weakref_slot=True)
 class Phone(object):
     """Contains a cluster of IPA characters indicating a single phone(me)."""
-    value = attr.ib(instance_of(unicode))
+    value = attr.ib(validator=instance_of(unicode))
+
+    @classmethod
+    def from_string(cls, s, intern=True):
+        if not intern:
+            return cls(value=s)
+        phone = _PHONES.get(s)
+        if phone is None:
+            phone = _PHONES.setdefault(s, cls(value=s))
+        return phone
+
+    # Unpickling goes through the intern tables, so that words parsed in
+    # other processes (see islex.load.stream_from_path_parallel) share
+    # phones and syllables like locally parsed ones.
+    def __reduce__(self):
+        return (Phone.from_string, (self.value,))
+
+
+PRIMARY_STRESS = u'ˈ'
+SECONDARY_STRESS = u'ˌ'
+# First characters of vowel phones, and the mark of syllabic consonants
+# (n̩, l̩), which can also be a syllable's nucleus.
+_VOWEL_STARTS = frozenset(u'aeiouæɑɔəɚɛɝɪʊʌ')
+_SYLLABIC = u'\u0329'
 
 
-@attr.s
+@enum.unique
+class Stress(enum.IntEnum):
+    """Stress of a syllable, numbered as in `Pron.stress_pattern`."""
+    NONE = 0
+    PRIMARY = 1
+    SECONDARY = 2
+
+
+_STRESS_DIGITS = u'012'
+# Distinct `Pron.stress_pattern` strings; a few hundred in islex-core.
+_STRESS_PATTERNS = {}
+
+
+def _syllable_structure(phones):
+    """``(start, end, stress)``: the slice of `phones` holding the nucleus
+    (its first stress-marked or vowel phone; empty if it has none) and
+    its `Stress`.
+    """
+    for i, phone in enumerate(phones):
+        v = phone.value
+        if v[:1] == PRIMARY_STRESS:
+            return i, i + 1, Stress.PRIMARY
+        if v[:1] == SECONDARY_STRESS:
+            return i, i + 1, Stress.SECONDARY
+        if v[:1] in _VOWEL_STARTS or _SYLLABIC in v:
+            return i, i + 1, Stress.NONE
+    return len(phones), len(phones), Stress.NONE
+
+
+@attr.s(slots=True, frozen=True, cache_hash=True, weakref_slot=True)
 class Syllable(object):
-    phones = attr.ib(instance_of(tuple))  # of strings? of Phones?
+    phones = attr.ib(validator=instance_of(tuple))  # of Phones
+    # Derived from `phones` when the syllable is built; syllables are
+    # interned, so this runs once per distinct syllable.
+    stress = attr.ib(init=False, eq=False, repr=False)
+    _nucleus_start = attr.ib(init=False, eq=False, repr=False)
+    _nucleus_end = attr.ib(init=False, eq=False, repr=False)
+
+    def __attrs_post_init__(self):
+        start, end, stress = _syllable_structure(self.phones)
+        object.__setattr__(self, 'stress', stress)
+        object.__setattr__(self, '_nucleus_start', start)
+        object.__setattr__(self, '_nucleus_end', end)
 
     @classmethod
-    def from_string(cls, s):
-        return cls(phones=tuple(Phone(value=p) for p in s.split()))
+    def from_string(cls, s, intern=True):
+        if not intern:
+            return cls(phones=tuple(Phone.from_string(p, intern=False)
+                                    for p in s.split()))
+        syll = _SYLLABLES.get(s)
+        if syll is None:
+            syll = _SYLLABLES.setdefault(s, cls(
+                phones=tuple(Phone.from_string(p) for p in s.split())))
+        return syll
 
     @property
     def ipa(self):
         return tuple(ph.value for ph in self.phones)
 
+    @property
+    def onset(self):
+        """Phones before the nucleus."""
+        return list(self.phones[:self._nucleus_start])
+
+    @property
+    def nucleus(self):
+        """The vowel (or syllabic consonant) phone, as a one-item list."""
+        return list(self.phones[self._nucleus_start:self._nucleus_end])
+
+    @property
+    def coda(self):
+        """Phones after the nucleus."""
+        return list(self.phones[self._nucleus_end:])
+
+    @property
+    def rhyme(self):
+        """The nucleus and coda."""
+        return list(self.phones[self._nucleus_start:])
+
+    @property
+    def is_stressed(self):
+        return self.stress != Stress.NONE
+
+    @property
+    def is_primary_stressed(self):
+        return self.stress == Stress.PRIMARY
+
     def to_string(self):
         return u" ".join(ph.value for ph in self.phones)
 
+    def __reduce__(self):
+        return (Syllable.from_string, (self.to_string(),))
+
 
-@attr.s
+@attr.s(slots=True, frozen=True, cache_hash=True)
 class Pron(object):
     sylls = attr.ib(validator=instance_of(tuple))
+    # One digit per syllable, its `Stress`: u'010' for "banana".  Interned,
+    # so equal patterns are shared.
+    stress_pattern = attr.ib(init=False, eq=False, repr=False)
+
+    def __attrs_post_init__(self):
+        pattern = u''.join([_STRESS_DIGITS[s.stress] for s in self.sylls])
+        object.__setattr__(self, 'stress_pattern',
+                           _STRESS_PATTERNS.setdefault(pattern, pattern))
 
     @classmethod
-    def from_string(cls, s, clean=False):
+    def from_string(cls, s, clean=False, intern=True):
+        """Parse an ISLE pron.  Its syllables and phones are shared through
+        the intern tables unless `intern` is false.
+        """
         s = s.strip()
-        raw_sylls = s.split(u' . ')
         if clean:
-            raw_sylls = [p.replace(u"ɛ̃", u"ɛ") for p in raw_sylls]
-        # TODO: break into phones?
-        return cls(sylls=tuple(Syllable.from_string(p) for p in raw_sylls))
+            s = s.replace(u"ɛ̃", u"ɛ")
+        return cls(sylls=tuple([Syllable.from_string(p, intern=intern)
+                                for p in s.split(u' . ')]))
 
     @property
     def ipa(self):
@@ -203,8 +434,11 @@ class Pron(object):
     def to_string(self):
         return u' . '.join(syll.to_string() for syll in self.sylls)
 
+    def __reduce__(self):
+        return (Pron, (self.sylls,))
 
-@attr.s
+
+@attr.s(slots=True, frozen=True, cache_hash=True)
 class Word(object):
     ortho = attr.ib()
     pos = attr.ib(validator=instance_of(tuple))  # of Pos
@@ -215,17 +449,19 @@ class Word(object):
     ortho_patt = re.compile(r'^([^\(]+?)\((.*)\)\s*$')
 
     @classmethod
-    def from_string(cls, s, clean=False):
+    def from_string(cls, s, clean=False, intern=True):
         s = s.strip()
         raw_prons = s.split(u'#')
         while not raw_prons[-1]:
             raw_prons.pop(-1)
         if len(raw_prons) < 2:
-            raise ValueError("string doesn't have enough segments: %s" % s)
+            raise ParseError(ParseErrorKind.TOO_FEW_SEGMENTS,
+                             "string doesn't have enough segments: %s" % s)
         raw_ortho = raw_prons.pop(0)
         m = cls.ortho_patt.match(raw_ortho)
         if not m:
-            raise ValueError("ortho doesn't match expected" % raw_ortho)
+            raise ParseError(ParseErrorKind.BAD_ORTHO,
+                             "ortho doesn't match expected: %s" % raw_ortho)
         ortho, raw_pos = m.groups()
         all_morphs = []
         all_pos = []
@@ -240,20 +476,109 @@ class Word(object):
                 try:
                     all_pos.append(Pos.from_string(t))
                 except KeyError as k:
-                    raise ValueError("pos tag %s not found" % k)
+                    raise ParseError(ParseErrorKind.UNKNOWN_POS_TAG,
+                                     "pos tag %s not found" % k)
 
-        all_prons = [Pron.from_string(raw_pron, clean=clean)
+        all_prons = [Pron.from_string(raw_pron, clean=clean, intern=intern)
                      for raw_pron in raw_prons]
 
         return cls(ortho=ortho, morphs=tuple(all_morphs), pos=tuple(all_pos),
                    prons=tuple(all_prons))
 
+    @classmethod
+    def from_string_fast(cls, s, clean=False, intern=True):
+        """Equivalent to `from_string`, without the regex or per-tag work.
+
+        Each distinct raw POS tag is decoded once and remembered, and equal
+        POS tuples are shared.  Pron parsing dominates either way, so on
+        the ISLE dictionary this is only about 1.05-1.1x faster than
+        `from_string` (``benchmarks/parse_speed.py``); the shared POS
+        tuples matter more, to `islex.writer`.
+        """
+        ortho, all_pos, all_morphs, raw_prons = _split_entry(s, clean)
+        all_prons = [Pron.from_string(raw_pron, clean=clean, intern=intern)
+                     for raw_pron in raw_prons]
+        return cls(ortho=ortho, morphs=all_morphs, pos=all_pos,
+                   prons=tuple(all_prons))
+
     def to_string(self):
         morph_pos = ','.join([m.to_string() for m in self.morphs + self.pos])
         key = u'%s(%s)' % (self.ortho, morph_pos)
         return u' # '.join([key] + [p.to_string() for p in self.prons])
 
+    # Token classes pickle as constructor arguments, which is much cheaper
+    # than restoring slot state; see islex.load.stream_from_path_parallel.
+    def __reduce__(self):
+        return (Word, (self.ortho, self.pos, self.morphs, self.prons))
+
     @property
     def ipa(self):
         return tuple(itertools.chain.from_iterable(
             pron.ipa for pron in self.prons))
+
+
+class LazyWord(object):
+    """A `Word` whose prons are only parsed when first used.
+
+    The ortho and tags are resolved up front, as by `Word.from_string_fast`
+    (so malformed lines still fail at load time); the pron segments are
+    kept as strings until `prons` is read.  Compares and hashes equal to
+    the `Word` it stands for.
+    """
+    __slots__ = ('ortho', 'pos', 'morphs', '_raw_prons', '_clean', '_prons',
+                 '_word')
+
+    def __init__(self, ortho, pos, morphs, raw_prons, clean=False):
+        self.ortho = ortho
+        self.pos = pos
+        self.morphs = morphs
+        self._raw_prons = tuple(raw_prons)
+        self._clean = clean
+        self._prons = None
+        self._word = None
+
+    @classmethod
+    def from_string(cls, s, clean=False):
+        ortho, all_pos, all_morphs, raw_prons = _split_entry(s, clean)
+        return cls(ortho, all_pos, all_morphs, raw_prons, clean=clean)
+
+    @property
+    def prons(self):
+        if self._prons is None:
+            self._prons = tuple(Pron.from_string(raw_pron, clean=self._clean)
+                                for raw_pron in self._raw_prons)
+        return self._prons
+
+    ipa = Word.ipa
+
+    def materialize(self):
+        """Return the fully parsed `Word` (built once, then kept)."""
+        if self._word is None:
+            self._word = Word(ortho=self.ortho, pos=self.pos,
+                              morphs=self.morphs, prons=self.prons)
+        return self._word
+
+    def to_string(self):
+        return self.materialize().to_string()
+
+    def __eq__(self, other):
+        if isinstance(other, LazyWord):
+            other = other.materialize()
+        if not isinstance(other, Word):
+            return NotImplemented
+        return self.materialize() == other
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        return hash(self.materialize())
+
+    def __reduce__(self):
+        return (LazyWord, (self.ortho, self.pos, self.morphs,
+                           self._raw_prons, self._clean))
+
+    def __repr__(self):
+        return 'LazyWord(ortho=%r, pos=%r, morphs=%r)' % (
+            self.ortho, self.pos, self.morphs)
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Bulk serialization of `Word` streams.
+
+`write_words` writes words as ISLE lines (the same text as
+`Word.to_string`), JSON Lines or TSV (ortho, POS tags, flat IPA).  The
+strings for POS tag lists and syllables, which repeat heavily, are built
+once per call and found again by object identity, so each word costs
+little more than joining cached pieces.
+"""
+
+from json.encoder import encode_basestring
+
+FORMATS = ('isle', 'jsonl', 'tsv')
+
+# Parsed ISLE data has about 16,000 distinct syllables and 800 POS tuples;
+# past this many objects the input is not interned (e.g.
+# ``Word.from_string(..., intern=False)``) and the ``id`` tables are dropped
+# and rebuilt rather than grown.
+_MAX_MEMO = 1 << 16
+
+
+class _Memo(object):
+    """Serialized POS tuples and syllables, keyed by ``id``.
+
+    Parsed words share their interned syllables and POS tuples, so these
+    tables stay small; they are cleared once they reach `_MAX_MEMO` objects.
+    Every memoized object is kept alive until then, so ids are never reused.
+    POS strings are also kept by tuple value, so they are only built once
+    per distinct tuple either way.
+    (Morph tuples are mostly unique to one stem, so they are not kept.)
+    """
+
+    def __init__(self):
+        self.pos = {}  # id(pos tuple) -> (csv, json list)
+        self.sylls = {}  # id(syllable) -> ISLE syllable string
+        self.json_sylls = {}  # id(syllable) -> the same, JSON-escaped
+        self._pos_values = {}  # pos tuple -> (csv, json list)
+        self._keep = []
+
+    def _trim(self):
+        # Cleared in place: the formatters hold the bound lookups.
+        if len(self._keep) >= _MAX_MEMO:
+            self.pos.clear()
+            self.sylls.clear()
+            self.json_sylls.clear()
+            del self._keep[:]
+
+    def add_pos(self, pos):
+        self._trim()
+        found = self._pos_values.get(pos)
+        if found is None:
+            tags = [p.to_string() for p in pos]
+            found = self._pos_values[pos] = (u','.join(tags),
+                                             _json_list(tags))
+        self._keep.append(pos)
+        self.pos[id(pos)] = found
+        return found
+
+    def add_sylls(self, prons):
+        self._trim()
+        for p in prons:
+            for s in p.sylls:
+                if id(s) not in self.sylls:
+                    self._keep.append(s)
+                    string = self.sylls[id(s)] = s.to_string()
+                    self.json_sylls[id(s)] = encode_basestring(string)[1:-1]
+
+
+def _json_list(strings):
+    return u'[%s]' % u', '.join(encode_basestring(s) for s in strings)
+
+
+def _pron_strings(w, syll, sep):
+    """The prons of `w` as strings, syllables joined by `sep`; `syll` maps
+    ``id(syllable)`` to its string.
+    """
+    return [sep.join(map(syll, map(id, p.sylls))) for p in w.prons]
+
+
+# Each formatter tries the fast path (map() over the C-level id and dict
+# lookups); on a miss it memoizes the word's syllables and tries again.
+
+def _isle_lines(words, memo):
+    pos_memo, syll = memo.pos, memo.sylls.__getitem__
+    for w in words:
+        tags = (pos_memo.get(id(w.pos)) or memo.add_pos(w.pos))[0]
+        if w.morphs:
+            morphs = u','.join([m.to_string() for m in w.morphs])
+            tags = morphs + u',' + tags if tags else morphs
+        try:
+            prons = _pron_strings(w, syll, u' . ')
+        except KeyError:
+            memo.add_sylls(w.prons)
+            prons = _pron_strings(w, syll, u' . ')
+        if prons:
+            yield u'%s(%s) # %s\n' % (w.ortho, tags, u' # '.join(prons))
+        else:
+            yield u'%s(%s)\n' % (w.ortho, tags)
+
+
+def _jsonl_lines(words, memo):
+    # Escaping commutes with joining on " . ", so prons are built from
+    # escaped syllables.
+    pos_memo, syll = memo.pos, memo.json_sylls.__getitem__
+    for w in words:
+        pos = (pos_memo.get(id(w.pos)) or memo.add_pos(w.pos))[1]
+        morphs = _json_list([m.to_string() for m in w.morphs])
+        try:
+            prons = _pron_strings(w, syll, u' . ')
+        except KeyError:
+            memo.add_sylls(w.prons)
+            prons = _pron_strings(w, syll, u' . ')
+        yield (u'{"ortho": %s, "pos": %s, "morphs": %s, "prons": %s}\n'
+               % (encode_basestring(w.ortho), pos, morphs,
+                  u'["%s"]' % u'", "'.join(prons) if prons else u'[]'))
+
+
+def _tsv_lines(words, memo):
+    pos_memo, syll = memo.pos, memo.sylls.__getitem__
+    for w in words:
+        pos = (pos_memo.get(id(w.pos)) or memo.add_pos(w.pos))[0]
+        try:
+            prons = _pron_strings(w, syll, u' ')
+        except KeyError:
+            memo.add_sylls(w.prons)
+            prons = _pron_strings(w, syll, u' ')
+        yield u'%s\t%s\t%s\n' % (w.ortho, pos, u' '.join(prons))
+
+
+_FORMATTERS = {
+    'isle': _isle_lines,
+    'jsonl': _jsonl_lines,
+    'tsv': _tsv_lines,
+}
+
+
+def format_words(words, format='isle'):
+    """Yield one newline-terminated line per word in `words`, in `format`.
+
+    ``jsonl`` lines are objects with ``ortho``, ``pos`` and ``morphs``
+    strings and ``prons`` as ISLE pron strings (``"k ˈæ t"``); ``tsv`` lines
+    are ortho, comma-separated POS tags and the space-separated phones of
+    all prons.
+    """
+    try:
+        formatter = _FORMATTERS[format]
+    except KeyError:
+        raise ValueError("unknown format %r; expected one of %s"
+                         % (format, ', '.join(FORMATS)))
+    return formatter(words, _Memo())
+
+
+def write_words(words, fh, format='isle', batch_words=10000):
+    """Write `words` to the text file `fh` in `format` (see `format_words`),
+    `batch_words` lines per write.  Returns the number of words written.
+    """
+    n = 0
+    batch = []
+    for line in format_words(words, format):
+        batch.append(line)
+        if len(batch) >= batch_words:
+            fh.write(u''.join(batch))
+            n += len(batch)
+            del batch[:]
+    fh.write(u''.join(batch))
+    return n + len(batch)
@@ -32,6 +32,9 @@ setup(
                  'islex'},
     include_package_data=True,
     install_requires=requirements,
+    extras_require={
+        'numpy': ['numpy'],
+    },
     license="MIT license",
     zip_safe=True,
     keywords='islex',
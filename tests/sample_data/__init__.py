@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""Tiny stand-in for an ``islex.data`` package, used by the tests."""
+
+from pkg_resources import resource_stream
+
+from islex.load import stream_from_fh
+
+
+def entries_stream():
+    return stream_from_fh(resource_stream(__name__, 'entries.txt'))
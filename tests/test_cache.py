@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_cache
+----------------------------------
+
+Tests for `islex.cache` module.
+"""
+
+import threading
+import time
+
+import pytest
+
+from islex import load
+from islex.cache import BuildCache, deep_sizeof
+
+from tests import sample_data
+
+
+class TestBuildCache(object):
+
+    def test_builds_once(self):
+        cache = BuildCache()
+        calls = []
+
+        def build():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        results = []
+        threads = [threading.Thread(
+            target=lambda: results.append(cache.get('k', build)))
+            for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+        stats = cache.stats()
+        assert stats.builds == 1
+        assert stats.hits + stats.misses == 8
+        assert stats.build_seconds > 0
+
+    def test_lru_entries(self):
+        cache = BuildCache(max_entries=2)
+        for key in 'abc':
+            cache.get(key, lambda: key)
+        assert 'a' not in cache
+        cache.get('b', lambda: None)  # touch b, so c is evicted next
+        cache.get('d', lambda: 'd')
+        assert 'b' in cache and 'd' in cache and 'c' not in cache
+        assert cache.stats().evictions == 2
+
+    def test_byte_budget(self):
+        cache = BuildCache(max_bytes=100, weigh=len)
+        cache.get('a', lambda: 'x' * 60)
+        cache.get('b', lambda: 'x' * 60)
+        assert 'a' not in cache
+        cache.get('c', lambda: 'x' * 500)
+        assert len(cache) == 1 and 'c' in cache
+        assert cache.stats().bytes == 500
+
+    def test_failed_build(self):
+        cache = BuildCache()
+        with pytest.raises(ZeroDivisionError):
+            cache.get('k', lambda: 1 // 0)
+        assert cache.get('k', lambda: 1) == 1
+
+    def test_invalidate(self):
+        cache = BuildCache()
+        cache.get(('x', 1), lambda: 1)
+        cache.get(('y', 1), lambda: 2)
+        cache.get(('y', 2), lambda: 3)
+        cache.invalidate(('x', 1))
+        cache.invalidate_where(lambda key: key[1] == 2)
+        assert len(cache) == 1 and ('y', 1) in cache
+
+    def test_deep_sizeof(self):
+        shared = u'x' * 1000
+        assert deep_sizeof([shared, shared]) < 2 * deep_sizeof(shared)
+        assert deep_sizeof(load.ortho_mapping(sample_data)) > 10000
+
+
+class TestLoadCache(object):
+
+    def test_invalidate_module(self):
+        mapping = load.ortho_mapping(sample_data)
+        assert load.ortho_mapping(sample_data) is mapping
+        load.invalidate(sample_data)
+        assert load.ortho_mapping(sample_data) is not mapping
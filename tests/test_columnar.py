@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_columnar
+----------------------------------
+
+Tests for `islex.columnar` module.
+"""
+
+import pytest
+
+from islex.columnar import ColumnarLexicon, NO_ENTITY
+from islex.load import ortho_mapping
+from islex.tokens import PosCategory
+
+from tests import sample_data
+
+
+@pytest.fixture
+def words():
+    return list(sample_data.entries_stream())
+
+
+class TestColumnarLexicon(object):
+
+    def test_round_trip(self, words):
+        lexicon = ColumnarLexicon.from_words(words)
+        assert len(lexicon) == len(words)
+        assert list(lexicon) == words
+
+    def test_from_mapping(self, words):
+        lexicon = ColumnarLexicon.from_mapping(ortho_mapping(sample_data))
+        assert sorted(lexicon, key=lambda w: w.to_string()) == \
+            sorted(words, key=lambda w: w.to_string())
+
+    def test_columns(self, words):
+        lexicon = ColumnarLexicon.from_words(words)
+        assert len(lexicon.word_offsets) == len(words) + 1
+        assert lexicon.word_offsets[-1] == sum(len(w.prons) for w in words)
+        assert lexicon.syll_offsets[-1] == len(lexicon.phone_ids)
+        first = words[0]
+        assert lexicon.pos_categories[0] == first.pos[0].category.value
+        n = len(first.ipa)
+        assert tuple(lexicon.phones[i] for i in lexicon.phone_ids[:n]) == \
+            first.ipa
+        paris = words.index(next(w for w in words if w.ortho == u'paris'))
+        entities = lexicon.pos_entities[lexicon.pos_offsets[paris]:
+                                        lexicon.pos_offsets[paris + 1]]
+        assert entities[0] == NO_ENTITY
+        assert PosCategory(lexicon.pos_categories[
+            lexicon.pos_offsets[paris]]) is PosCategory.NN
+
+    def test_numpy(self, words, tmpdir):
+        numpy = pytest.importorskip('numpy')
+        lexicon = ColumnarLexicon.from_words(words)
+        arrays = lexicon.as_numpy()
+        assert arrays['phone_ids'].dtype == numpy.uint16
+        assert numpy.diff(arrays['word_offsets']).sum() == \
+            sum(len(w.prons) for w in words)
+        path = str(tmpdir.join('lexicon.npz'))
+        lexicon.save_npz(path)
+        assert list(ColumnarLexicon.load_npz(path)) == words
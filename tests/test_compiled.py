@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_compiled
+----------------------------------
+
+Tests for `islex.compiled` module.
+"""
+
+import os
+import os.path
+import subprocess
+import sys
+
+import attr
+import pytest
+
+from islex import load
+from islex.compiled import compile_index, CompiledMapping, shared_mapping
+from islex.load import ortho_mapping, shared_ortho_mapping
+from islex.tokens import clear_intern_tables, intern_table_size
+
+from tests import sample_data
+
+
+@pytest.fixture
+def index_path(tmpdir):
+    path = str(tmpdir.join('core.islx'))
+    compile_index(sample_data.entries_stream(), path)
+    return path
+
+
+class TestCompiledMapping(object):
+
+    def test_matches_ortho_mapping(self, index_path):
+        expected = ortho_mapping(sample_data)
+        with CompiledMapping(index_path) as compiled:
+            assert len(compiled) == len(expected)
+            assert sorted(compiled) == sorted(expected)
+            for key in expected:
+                assert compiled[key] == expected[key]
+
+    def test_case_insensitive(self, index_path):
+        with CompiledMapping(index_path) as compiled:
+            assert compiled['Paris'] == compiled['paris']
+            assert len(compiled['PARIS']) == 2
+            assert 'Record' in compiled
+
+    def test_missing(self, index_path):
+        with CompiledMapping(index_path) as compiled:
+            assert 'zyzzyva' not in compiled
+            with pytest.raises(KeyError):
+                compiled['zyzzyva']
+
+    def test_lookup_many(self, index_path):
+        tokens = [u'Paris', u'zyzzyva', u'paris', u'Paris']
+        with CompiledMapping(index_path) as compiled:
+            hits, oov = compiled.lookup_many(tokens)
+            assert hits == ortho_mapping(sample_data).lookup_many(tokens)[0]
+            assert oov == [u'zyzzyva']
+
+    def test_lookups_not_interned(self, index_path):
+        clear_intern_tables()
+        with CompiledMapping(index_path) as compiled:
+            words = compiled['record']
+            assert intern_table_size()['syllables'] == 0
+            assert words == ortho_mapping(sample_data)['record']
+
+    def test_not_an_index(self, tmpdir):
+        path = tmpdir.join('bogus.islx')
+        path.write_binary(b'\0' * 64)
+        with pytest.raises(ValueError):
+            CompiledMapping(str(path))
+
+
+def no_words():
+    raise AssertionError("index compiled again")
+
+
+def big_words(copies):
+    """The sample entries `copies` times over, under distinct orthos."""
+    words = list(sample_data.entries_stream())
+    for i in range(copies):
+        for w in words:
+            yield attr.evolve(w, ortho=u'%s%d' % (w.ortho, i))
+
+
+# Attaches to the index, looks up every key, and reports how much anonymous
+# (heap) memory the lookups took and how much of the index file is resident
+# in this process, then waits to be released.
+WORKER = '''
+import sys
+from islex.compiled import shared_mapping
+
+def smaps_kb(fields, path=None):
+    found = dict.fromkeys(fields, 0)
+    name = None
+    with open('/proc/self/smaps' if path else '/proc/self/smaps_rollup') as fh:
+        for line in fh:
+            parts = line.split()
+            if not line[0].isupper() or not parts[0].endswith(':'):
+                name = parts[-1]
+            elif parts[0][:-1] in found and (path is None or name == path):
+                found[parts[0][:-1]] += int(parts[1])
+    return found
+
+import islex.tokens  # parses lookups; not part of the dictionary's cost
+path = sys.argv[1]
+mapping = shared_mapping(path, None)
+for key in list(mapping)[:100]:  # warm up the allocator and regex cache
+    mapping[key]
+before = smaps_kb(['Anonymous'])['Anonymous']
+for key in mapping:
+    mapping[key]
+print(smaps_kb(['Anonymous'])['Anonymous'] - before,
+      smaps_kb(['Rss'], path)['Rss'])
+sys.stdout.flush()
+sys.stdin.read()
+'''
+
+
+class TestSharedMapping(object):
+
+    def test_compiles_once(self, tmpdir):
+        path = str(tmpdir.join('core.islx'))
+        first = shared_mapping(path, sample_data.entries_stream)
+        with first, shared_mapping(path, no_words) as second:
+            assert dict(first) == dict(second)
+            assert second['paris'] == ortho_mapping(sample_data)['paris']
+
+    def test_ortho_mapping(self, tmpdir):
+        path = str(tmpdir.join('core.islx'))
+        mapping = shared_ortho_mapping(sample_data, path)
+        assert shared_ortho_mapping(sample_data, path) is mapping
+        assert sorted(mapping) == sorted(ortho_mapping(sample_data))
+        load.invalidate(sample_data)
+        mapping.close()
+
+    def run_workers(self, path, n):
+        """``(heap_kb, mapped_kb)`` from `n` concurrent `WORKER` processes."""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, PYTHONPATH=root)
+        workers = [subprocess.Popen([sys.executable, '-c', WORKER, path],
+                                    env=env, stdin=subprocess.PIPE,
+                                    stdout=subprocess.PIPE,
+                                    universal_newlines=True)
+                   for _ in range(n)]
+        try:
+            return [[int(k) for k in w.stdout.readline().split()]
+                    for w in workers]
+        finally:
+            for w in workers:
+                w.communicate('')
+
+    @pytest.mark.skipif(not os.path.exists('/proc/self/smaps_rollup'),
+                        reason="needs Linux /proc smaps")
+    def test_worker_memory(self, tmpdir):
+        path = str(tmpdir.join('big.islx'))
+        compile_index(big_words(400), path)
+        size_kb = os.path.getsize(path) // 1024
+        alone = self.run_workers(path, 1)
+        together = self.run_workers(path, 4)
+        # The whole index is resident in every worker, but as shared pages
+        # of the one file: the heaps of four workers together grow by
+        # about as much as one worker's, nowhere near an extra copy of the
+        # index each.
+        for heap_kb, mapped_kb in alone + together:
+            assert mapped_kb >= size_kb * 0.9
+        growth_kb = sum(heap for heap, _ in together) - alone[0][0]
+        assert growth_kb < size_kb * 0.1
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_import
+----------------------------------
+
+Cold-import cost of the `islex` package.
+"""
+
+import os
+import os.path
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous budgets for the cumulative cold-import time, in seconds; these
+# catch gross regressions, the module checks below catch the usual ones.
+BUDGETS = {
+    'islex': 0.05,
+    'islex.compiled': 0.1,
+    'islex.load': 0.5,
+}
+
+
+def run(statement, *flags):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run([sys.executable] + list(flags) + ['-c', statement],
+                          env=env, check=True, capture_output=True,
+                          universal_newlines=True)
+
+
+def modules_after(statement):
+    out = run(statement + '; import sys; print("\\n".join(sys.modules))')
+    return set(out.stdout.split())
+
+
+def import_seconds(module):
+    """Cumulative import time of `module`, from ``python -X importtime``."""
+    err = run('import %s' % module, '-X', 'importtime').stderr
+    for line in err.splitlines():
+        if line.rsplit('|', 1)[-1].strip() == module:
+            return int(line.split('|')[1]) / 1e6
+    raise AssertionError("no import time reported for %s" % module)
+
+
+class TestColdImport(object):
+
+    def test_package_is_empty(self):
+        loaded = modules_after('import islex')
+        assert not any(m.startswith('islex.') for m in loaded)
+
+    def test_submodules_on_attribute_access(self):
+        loaded = modules_after('import islex; islex.index')
+        assert 'islex.index' in loaded
+
+    def test_compiled_lookup_skips_tokens(self):
+        loaded = modules_after('from islex.compiled import CompiledMapping')
+        assert 'islex.tokens' not in loaded
+        assert 'attr' not in loaded
+
+    def test_load_skips_heavy_modules(self):
+        loaded = modules_after('import islex.load')
+        for module in ('asyncio', 'argparse', 'concurrent.futures', 'json',
+                       'pkg_resources', 'islex.index', 'islex.nearest'):
+            assert module not in loaded
+
+    @pytest.mark.parametrize('module', sorted(BUDGETS))
+    def test_import_time(self, module):
+        assert import_seconds(module) < BUDGETS[module]
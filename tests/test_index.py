@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_index
+----------------------------------
+
+Tests for `islex.index` module.
+"""
+
+import threading
+
+from islex import load
+from islex.index import MorphIndex, MorphRole, morph_roles, pron_key, \
+    rhyme_key, strip_stress
+from islex.load import morph_index, ortho_mapping, ortho_search, \
+    phone_ngram_index, pos_index, pron_mapping, rhyme_mapping, stress_index
+from islex.tokens import Pron, PosCategory, EntityCategory, Word
+
+from tests import sample_data
+
+
+def orthos(words):
+    return sorted(set(w.ortho for w in words))
+
+
+class TestPronIndex(object):
+
+    def test_pron_key(self):
+        pron = Pron.from_string(u"ɹ ˈɛ . k ɚ d")
+        assert pron_key(pron) == (u'ɹ', u'ˈɛ', u'k', u'ɚ', u'd')
+        assert pron_key(pron, stress=False) == (u'ɹ', u'ɛ', u'k', u'ɚ', u'd')
+        assert pron_key(u"ɹ ˈɛ . k ɚ d", syllables=True) == \
+            ((u'ɹ', u'ˈɛ'), (u'k', u'ɚ', u'd'))
+        assert strip_stress(u'ˌoʊ') == u'oʊ'
+
+    def test_lookup(self):
+        index = pron_mapping(sample_data)
+        assert orthos(index[u"t ˈu"]) == [u'to', u'too', u'two']
+        assert orthos(index[Pron.from_string(u"ɹ ˈɛ d")]) == [u'read', u'red']
+        assert u"z ˈɪ p" not in index
+
+    def test_ignore_stress(self):
+        index = pron_mapping(sample_data, stress=False)
+        assert orthos(index[u"l ɛ d"]) == [u'lead', u'led']
+        assert orthos(pron_mapping(sample_data)[u"l ɛ d"]) == [u'lead']
+
+    def test_syllables(self):
+        index = pron_mapping(sample_data, syllables=True)
+        assert orthos(index[u"f ˈoʊ . t ˌoʊ"]) == [u'photo']
+        assert u"f ˈoʊ t ˌoʊ" not in index
+
+    def test_homophones(self):
+        index = pron_mapping(sample_data)
+        red = ortho_mapping(sample_data)['red'][0]
+        assert orthos(index.homophones(red)) == [u'read']
+        read_entries = ortho_mapping(sample_data)['read']
+        assert orthos(index.homophones(read_entries[0])) == [u'reed']
+
+
+class TestOrthoSearch(object):
+
+    def test_prefix(self):
+        search = ortho_search(sample_data)
+        assert search.prefix(u'Photo') == [u'photo', u'photograph',
+                                           u'photographer', u'photos']
+        assert search.prefix(u'zz') == []
+
+    def test_glob(self):
+        search = ortho_search(sample_data)
+        assert search.glob(u'photo*') == search.prefix(u'photo')
+        assert search.glob(u'?at') == [u'bat', u'cat', u'hat']
+        assert search.glob(u'*s') == [u'paris', u'photos', u'records']
+        assert search.glob(u'r*d') == [u'read', u'record', u'red', u'reed']
+        assert search.glob(u'T?o') == [u'too', u'two']
+        assert search.glob(u'two') == [u'two']
+        assert search.glob(u'tw') == []
+
+    def test_memory_usage(self):
+        assert ortho_search(sample_data).memory_usage() > 0
+
+
+class TestRhymesAndNgrams(object):
+
+    def test_rhyme_key(self):
+        assert rhyme_key(u"f ə . t ˈɑ . g ɹ ə f") == (u'ɑ', u'g', u'ɹ',
+                                                      u'ə', u'f')
+        assert rhyme_key(u"ð ə") == (u'ð', u'ə')
+
+    def test_rhymes(self):
+        index = rhyme_mapping(sample_data)
+        assert orthos(index[u"ˈæ t"]) == [u'at', u'bat', u'cat', u'hat']
+        cat = ortho_mapping(sample_data)['cat'][0]
+        assert orthos(index.rhymes(cat)) == [u'at', u'bat', u'hat']
+
+    def test_ngrams(self):
+        index = phone_ngram_index(sample_data)
+        assert orthos(index.search(u"s t ɹ")) == [u'street', u'strong']
+        assert orthos(index.search(u"t ɹ ˈi t")) == [u'street']
+        assert orthos(index.search([u'ʃ'])) == []
+        assert index.search(u"") == []
+
+    def test_long_query_checks_order(self):
+        index = phone_ngram_index(sample_data, max_n=2)
+        assert orthos(index.search(u"ɹ ɪ k ɑ ɹ d")) == [u'record']
+        assert orthos(index.search(u"ɹ ɪ k ɑ d")) == []
+
+
+class TestPosIndex(object):
+
+    def scan(self, index, predicate):
+        return [w for w in index.words if predicate(
+            set(p.category for p in w.pos)
+            | set(p.entity_type for p in w.pos))]
+
+    def test_all_of_none_of(self):
+        index = pos_index(sample_data)
+        found = index.select(all_of=[PosCategory.NNP, EntityCategory.CITY],
+                             none_of=[PosCategory.VB])
+        assert orthos(found) == [u'paris']
+        assert found == self.scan(index, lambda cats: {
+            PosCategory.NNP, EntityCategory.CITY} <= cats
+            and PosCategory.VB not in cats)
+
+    def test_any_of(self):
+        index = pos_index(sample_data)
+        found = index.select(any_of=[PosCategory.VBD, PosCategory.VBZ])
+        assert orthos(found) == [u'led', u'read', u'records']
+        assert index.count(any_of=[PosCategory.VBD, PosCategory.VBZ]) == 3
+
+    def test_ids(self):
+        index = pos_index(sample_data)
+        ids = index.ids(all_of=[EntityCategory.SURNAME],
+                        none_of=[PosCategory.NN])
+        assert ids == sorted(ids)
+        assert [index.words[i] for i in ids] == self.scan(
+            index, lambda cats: EntityCategory.SURNAME in cats
+            and PosCategory.NN not in cats)
+
+    def test_everything_and_nothing(self):
+        index = pos_index(sample_data)
+        assert index.count() == len(index) == 49
+        assert index.select(all_of=[PosCategory.PUNC]) == []
+        assert index.count(none_of=[PosCategory.NN]) == len(self.scan(
+            index, lambda cats: PosCategory.NN not in cats))
+
+
+class TestMorphIndex(object):
+
+    def test_roles(self):
+        assert morph_roles((u'dis', u'ability', u's')) == (
+            MorphRole.PREFIX, MorphRole.STEM, MorphRole.SUFFIX)
+        assert morph_roles((u'photo', u's')) == (
+            MorphRole.STEM, MorphRole.SUFFIX)
+        for emes in [(u'pay', u'ment'), (u'fit', u'ness'), (u'go', u'ing'),
+                     (u'ship', u'man')]:
+            assert morph_roles(emes)[0] == MorphRole.STEM
+        assert morph_roles((u'un', u'do')) == (
+            MorphRole.PREFIX, MorphRole.STEM)
+        assert morph_roles((u'photo', u'graph', u'er')) == (
+            MorphRole.STEM, MorphRole.STEM, MorphRole.SUFFIX)
+
+    def test_short_stems(self):
+        index = MorphIndex([
+            Word.from_string(u"payment(+pay+ment,nn) # p ˈei . m ə n t"),
+            Word.from_string(u"undo(+un+do,vb) # ˌʌ n . d ˈu")])
+        assert orthos(index.suffixed(u'ment')) == [u'payment']
+        assert orthos(index.derivations(u'do')) == [u'undo']
+        assert orthos(index.prefixed(u'un')) == [u'undo']
+
+    def test_built_with_ortho_mapping(self):
+        load.invalidate(sample_data)
+        ortho_mapping(sample_data)
+        assert ('morph', sample_data, False) in load.CACHE
+        index = morph_index(sample_data)
+        assert sorted(index) == [u'er', u'individual', u'ly', u'photo',
+                                 u'photograph', u'record', u's', u'y']
+
+    def test_cold_cache(self):
+        load.invalidate(sample_data)
+        found = []
+        thread = threading.Thread(
+            target=lambda: found.append(morph_index(sample_data)))
+        thread.daemon = True
+        thread.start()
+        thread.join(timeout=5)
+        assert found, "morph_index did not return"
+        assert found[0] is morph_index(sample_data)
+        assert u'photograph' in found[0]
+
+    def test_lookups(self):
+        index = morph_index(sample_data)
+        assert orthos(index.words(u'individual')) == [u'individually']
+        assert len(index.words(u'Individual')) == 3  # each entry once
+        assert orthos(index.derivations(u'record')) == [u'records']
+        assert orthos(index.suffixed(u's')) == [u'photos', u'records']
+        assert index.suffixed(u'record') == []
+        assert index.prefixed(u'photo') == []
+        assert u'photograph' in index and u'zzz' not in index
+
+    def test_add_after_query(self):
+        words = list(ortho_mapping(sample_data)[u'photos'])
+        index = MorphIndex(words)
+        assert orthos(index.derivations(u'photo')) == [u'photos']
+        index.add(ortho_mapping(sample_data)[u'photographer'][0])
+        assert orthos(index.suffixed(u'er')) == [u'photographer']
+
+
+class TestStressIndex(object):
+
+    def test_patterns(self):
+        index = stress_index(sample_data)
+        assert u'010' in index and u'11' not in index
+        assert orthos(index.words(u'010')) == [u'photograph']
+        assert orthos(index.words(u'01')) == [u'record', u'records']
+        assert len(index.words(u'01')) == 4  # once per word, not per pron
+        assert index.words(u'0000') == []
+
+    def test_match(self):
+        index = stress_index(sample_data)
+        assert orthos(index.match(u'1??')) == [u'photograph', u'photographer']
+        assert orthos(index.match(u'1?')) == [
+            u'paris', u'photo', u'photos', u'record', u'records', u'seven']
+        assert orthos(index.match(u'2*')) == [u'007', u'a', u'individually']
+        assert len(index.match(u'*')) == sum(
+            len(ws) for ws in ortho_mapping(sample_data).values())
+
+    def test_stressed_on(self):
+        index = stress_index(sample_data)
+        assert orthos(index.stressed_on(0, syllables=3)) == [
+            u'photograph', u'photographer']
+        assert orthos(index.stressed_on(-1, syllables=2)) == [
+            u'record', u'records']
+        assert orthos(index.stressed_on(2)) == [u'individually']
+        assert index.stressed_on(9) == []
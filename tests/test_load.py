@@ -0,0 +1,394 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_load
+----------------------------------
+
+Tests for `islex.load` module.
+"""
+
+import asyncio
+import io
+import os.path
+import threading
+import types
+
+import pytest
+
+from islex import load
+from islex.load import stream_from_fh, stream_from_path_parallel, \
+    layered_mapping, ortho_mapping, ortho_mapping_background, MergePolicy
+from islex.tokens import LazyWord, ParseErrorKind, Word
+
+from tests import sample_data
+
+ENTRIES = os.path.join(os.path.dirname(sample_data.__file__), 'entries.txt')
+
+
+class TestParallelStream(object):
+
+    @classmethod
+    def setup_class(cls):
+        with open(ENTRIES, mode='rb') as fh:
+            cls.expected = list(stream_from_fh(fh))
+
+    def test_ordered(self):
+        words = list(stream_from_path_parallel(ENTRIES, workers=2,
+                                               chunk_bytes=256))
+        assert words == self.expected
+
+    def test_unordered(self):
+        words = list(stream_from_path_parallel(ENTRIES, workers=2,
+                                               ordered=False,
+                                               chunk_bytes=256))
+        assert sorted(words, key=lambda w: w.to_string()) == \
+            sorted(self.expected, key=lambda w: w.to_string())
+
+    def test_shared_tokens(self):
+        words = list(stream_from_path_parallel(ENTRIES, workers=2,
+                                               chunk_bytes=256))
+        sylls = [s for w in words for p in w.prons for s in p.sylls]
+        phones = [ph for s in sylls for ph in s.phones]
+        assert len(set(map(id, sylls))) == len(set(sylls))
+        assert len(set(map(id, phones))) == len(set(phones))
+
+    def test_bounded_in_flight(self, monkeypatch):
+        from concurrent import futures
+        submitted = []
+        submit = futures.ProcessPoolExecutor.submit
+
+        def counting_submit(pool, *args, **kwargs):
+            submitted.append(args)
+            return submit(pool, *args, **kwargs)
+
+        monkeypatch.setattr(futures.ProcessPoolExecutor, 'submit',
+                            counting_submit)
+        words = stream_from_path_parallel(ENTRIES, workers=2, chunk_bytes=64)
+        assert next(words) == self.expected[0]
+        words.close()
+        assert len(load._chunk_ranges(ENTRIES, 64)) > 10
+        assert len(submitted) == 5
+
+    def test_single_chunk(self):
+        words = list(stream_from_path_parallel(ENTRIES, workers=1))
+        assert words == self.expected
+
+
+BAD_LINES = u"""\
+cat(nn) # k ˈæ t
+no segments
+cat nn # k ˈæ t
+dog(xyzzy) # d ˈɔ g
+dog(nn) # d ˈɔ g
+""".encode('utf-8') + b"\xff(nn) # f u\n"
+
+
+class TestStreamErrors(object):
+
+    def stream(self, **kwargs):
+        bad = []
+        lines = BAD_LINES.splitlines(True)
+        words = list(stream_from_fh(lines, errors=bad.append, **kwargs))
+        return words, bad
+
+    def test_sink(self, capsys):
+        words, bad = self.stream()
+        assert [w.ortho for w in words] == [u'cat', u'dog']
+        assert [(b.lineno, b.kind) for b in bad] == [
+            (2, ParseErrorKind.TOO_FEW_SEGMENTS),
+            (3, ParseErrorKind.BAD_ORTHO),
+            (4, ParseErrorKind.UNKNOWN_POS_TAG),
+            (6, ParseErrorKind.BAD_ENCODING)]
+        assert 'XYZZY' in bad[2].message
+        assert capsys.readouterr().out == ''
+
+    def test_stats(self):
+        stats = load.StreamStats()
+        words, bad = self.stream(stats=stats, first_line=10)
+        assert stats.lines == 6
+        assert stats.words == 2
+        assert stats.errors[ParseErrorKind.BAD_ORTHO] == 1
+        assert sum(stats.errors.values()) == 4
+        assert stats.error_lines[ParseErrorKind.UNKNOWN_POS_TAG] == [13]
+        assert sorted(stats.seconds) == sorted(load.STAGES)
+
+    def test_default_sink_logs(self, caplog, capsys):
+        with caplog.at_level('WARNING', logger='islex.load'):
+            list(stream_from_fh(BAD_LINES.splitlines(True)))
+        assert len(caplog.records) == 4
+        assert caplog.records[0].getMessage().startswith('line 2: ')
+        assert capsys.readouterr().out == ''
+
+    @pytest.mark.parametrize('ordered', [True, False])
+    def test_parallel(self, tmpdir, ordered):
+        path = tmpdir.join('bad.txt')
+        path.write_binary(BAD_LINES * 3)
+        bad = []
+        stats = load.StreamStats()
+        words = list(stream_from_path_parallel(
+            str(path), workers=2, ordered=ordered, chunk_bytes=40,
+            errors=bad.append, stats=stats))
+        assert len(words) == stats.words == 6
+        assert stats.lines == 18
+        assert sorted(b.lineno for b in bad) == [2, 3, 4, 6, 8, 9, 10, 12,
+                                                 14, 15, 16, 18]
+        assert stats.errors[ParseErrorKind.BAD_ENCODING] == 3
+
+
+class TestOrthoMapping(object):
+
+    def test_all_entries_kept(self):
+        mapping = ortho_mapping(sample_data)
+        assert len(mapping['record']) == 5
+        assert len(mapping['Paris']) == 2
+
+    def test_lookup_many(self):
+        mapping = ortho_mapping(sample_data)
+        tokens = u"The cat sat on the Record the cat".split()
+        hits, oov = mapping.lookup_many(tokens)
+        assert sorted(hits) == [u'Record', u'The', u'cat', u'the']
+        assert hits[u'The'] == mapping[u'the']
+        assert hits[u'Record'] == mapping[u'record']
+        assert oov == [u'sat', u'on']
+        assert mapping.lookup_many([]) == ({}, [])
+
+    def test_lazy_closes_entries(self, monkeypatch):
+        opened = []
+
+        def entries_fh(module):
+            opened.append(io.open(ENTRIES, mode='rb'))
+            return opened[-1]
+        monkeypatch.setattr(load, 'entries_fh', entries_fh)
+        load.invalidate(sample_data)
+        assert len(ortho_mapping(sample_data, lazy=True)['record']) == 5
+        assert len(opened) == 1 and opened[0].closed
+        load.invalidate(sample_data)
+
+    def test_lazy(self):
+        lazy = ortho_mapping(sample_data, lazy=True)
+        eager = ortho_mapping(sample_data)
+        assert lazy is not eager
+        assert all(isinstance(w, LazyWord) for w in lazy['record'])
+        assert sorted(lazy) == sorted(eager)
+        for key in eager:
+            assert lazy[key] == eager[key]
+
+
+def gated_module(name, release):
+    """A data module whose entries pause before 'paris' until `release`."""
+    module = types.ModuleType(name)
+
+    def entries_stream():
+        for w in sample_data.entries_stream():
+            if w.ortho == u'paris':
+                release.wait()
+            yield w
+    module.entries_stream = entries_stream
+    return module
+
+
+class TestBackgroundMapping(object):
+
+    def test_progressive(self):
+        release = threading.Event()
+        module = gated_module('gated_progressive', release)
+        mapping = ortho_mapping_background(module)
+        assert not mapping.wait(timeout=0.2)
+        assert not mapping.ready
+        assert len(mapping['at']) == 2
+        assert 'paris' not in mapping
+        assert 0 < mapping.loaded < 49
+        release.set()
+        assert mapping.wait(timeout=5)
+        assert len(mapping['paris']) == 2
+        assert mapping.loaded == 49
+        assert ortho_mapping(module) is mapping
+        load.invalidate(module)
+
+    def test_entries_replaced_not_grown(self):
+        store = {}
+        first = Word.from_string(u"Paris(nnp) # p ˈæ . ɹ ɪ s")
+        second = Word.from_string(u"paris(nnp) # p ə . ɹ ˈi")
+        load._add_word(store, first)
+        seen = store['paris']
+        load._add_word(store, second)
+        assert seen == [first]
+        assert store['paris'] == [first, second]
+
+    def test_already_loaded(self):
+        eager = ortho_mapping(sample_data)
+        mapping = ortho_mapping_background(sample_data)
+        assert mapping.wait(timeout=5)
+        assert dict(mapping) == dict(eager)
+
+    def test_await(self):
+        release = threading.Event()
+        module = gated_module('gated_await', release)
+
+        async def main():
+            mapping = ortho_mapping_background(module)
+            release.set()
+            return await mapping
+
+        mapping = asyncio.run(main())
+        assert mapping.ready
+        assert len(mapping['record']) == 5
+        load.invalidate(module)
+
+    def test_error(self):
+        module = types.ModuleType('broken')
+        module.entries_stream = lambda: 1 // 0
+        mapping = ortho_mapping_background(module)
+        with pytest.raises(ZeroDivisionError):
+            mapping.wait(timeout=5)
+
+
+def words_module(name, lines):
+    """A data module whose entries are the ISLE `lines`."""
+    module = types.ModuleType(name)
+    module.entries_stream = lambda: (Word.from_string(ln) for ln in lines)
+    return module
+
+
+class TestLayeredMapping(object):
+
+    @classmethod
+    def setup_class(cls):
+        cls.entities = words_module('entities', [
+            u"paris(nnp_city) # p ə . ɹ ˈi #",
+            u"zzyzx(nnp_city) # z ˈaɪ . z ɪ k s #"])
+        cls.periphery = words_module('periphery', [
+            u"zzyzx(nn) # z ˈɪ . z ɪ k s #",
+            u"aardvark(nn) # ˈɑ ɹ d . v ˌɑ ɹ k #"])
+        cls.modules = [sample_data, cls.entities, cls.periphery]
+
+    @classmethod
+    def teardown_class(cls):
+        load.invalidate(cls.entities)
+        load.invalidate(cls.periphery)
+
+    def test_first_wins(self):
+        mapping = layered_mapping(self.modules)
+        core = ortho_mapping(sample_data)
+        assert mapping['Paris'] is core['paris']
+        assert mapping['zzyzx'] is ortho_mapping(self.entities)['zzyzx']
+        assert len(mapping['aardvark']) == 1
+        assert len(mapping) == len(core) + 2
+        assert layered_mapping(self.modules) is mapping
+
+    def test_union(self):
+        mapping = layered_mapping(self.modules, merge=MergePolicy.UNION)
+        core = ortho_mapping(sample_data)
+        assert mapping['paris'] == core['paris'] + [
+            Word.from_string(u"paris(nnp_city) # p ə . ɹ ˈi #")]
+        assert len(core['paris']) == 2  # layers are not modified
+        assert [w.pos[0].to_string() for w in mapping['zzyzx']] == [
+            u'nnp_city', u'nn']
+        assert mapping['record'] is core['record']
+        hits, oov = mapping.lookup_many([u'Aardvark', u'cat', u'xyzzy'])
+        assert sorted(hits) == [u'Aardvark', u'cat'] and oov == [u'xyzzy']
+
+    def test_invalidate(self):
+        layered_mapping(self.modules)
+        key = ('layered', tuple(self.modules), MergePolicy.FIRST_WINS, False)
+        assert key in load.CACHE
+        load.invalidate(self.periphery)
+        assert key not in load.CACHE
+
+
+RAW_ISLE = u"""\
+007(+abbreviation,nnp_person) # d ˌʌ . b ə l . ˌoʊ . s ˌɛ̃ . v ˌɪ n #
+cat(nn,nnp) # k ˈæ t #
+paris(nnp_city,nnp_surname) # p ˈæ . ɹ ɪ s #
+zzyzx() # z ˈaɪ . z ɪ k s #
+broken line
+"""
+
+
+class TestPackageData(object):
+
+    @pytest.fixture
+    def isle_file(self, tmpdir):
+        path = tmpdir.join('ISLEdict.txt')
+        path.write_text(RAW_ISLE, encoding='utf-8')
+        return str(path)
+
+    def read_package(self, root, stem):
+        path = root.join('islex-%s' % stem, 'islex-%s' % stem, 'entries.txt')
+        return path.read_text(encoding='utf-8').splitlines()
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_build(self, isle_file, tmpdir, workers):
+        root = tmpdir.join('src')
+        reports = []
+        counts = load.build_package_data(
+            isle_file, str(root), workers=workers, batch_lines=1,
+            progress=lambda n, secs: reports.append(n))
+        assert counts == {'core': 1, 'entities': 2, 'periphery': 1}
+        assert reports[-1] == 4
+        assert self.read_package(root, 'core') == [u"cat(nn,nnp) # k ˈæ t"]
+        assert self.read_package(root, 'entities') == [
+            u"007(abbreviation,nnp_person) # "
+            u"d ˌʌ . b ə l . ˌoʊ . s ˌɛ . v ˌɪ n",
+            u"paris(nnp_city,nnp_surname) # p ˈæ . ɹ ɪ s"]
+        assert self.read_package(root, 'periphery') == [
+            u"zzyzx() # z ˈaɪ . z ɪ k s"]
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_failed_build_keeps_packages(self, isle_file, tmpdir, workers):
+        root = tmpdir.join('src')
+        load.build_package_data(isle_file, str(root))
+        with pytest.raises(IOError):
+            load.build_package_data(str(tmpdir.join('missing.txt')),
+                                    str(root), workers=workers)
+        assert self.read_package(root, 'core') == [u"cat(nn,nnp) # k ˈæ t"]
+        package_dir = root.join('islex-core', 'islex-core')
+        assert package_dir.listdir() == [package_dir.join('entries.txt')]
+
+    def test_cli(self, isle_file, tmpdir):
+        root = tmpdir.join('src')
+        load.write_package_data(['--isle-file', isle_file,
+                                 '--checkout-root', str(root), '--quiet'])
+        assert len(self.read_package(root, 'entities')) == 2
+
+    def test_cli_needs_paths(self, isle_file, capsys):
+        with pytest.raises(SystemExit):
+            load.write_package_data(['--isle-file', isle_file])
+        assert '--checkout-root' in capsys.readouterr().err
+
+    def test_incremental(self, isle_file, tmpdir):
+        root = str(tmpdir.join('src'))
+        first = load.update_package_data(isle_file, root)
+        assert first['reparsed'] == 5 and first['reused'] == 0
+        assert sorted(first['rewritten']) == ['core', 'entities', 'periphery']
+        full = tmpdir.join('full')
+        load.build_package_data(isle_file, str(full))
+        for stem in load.PACKAGE_STEMS:
+            assert (self.read_package(tmpdir.join('src'), stem)
+                    == self.read_package(full, stem))
+
+        again = load.update_package_data(isle_file, root)
+        assert again['reparsed'] == 0 and again['reused'] == 5
+        assert again['rewritten'] == []
+
+        # Change cat, drop zzyzx, add a word.
+        with io.open(isle_file, 'w', encoding='utf-8') as fh:
+            fh.write(RAW_ISLE.replace(u'k ˈæ t', u'k ˈɑ t')
+                     .replace(u'zzyzx() # z ˈaɪ . z ɪ k s #\n', u'')
+                     + u"dog(nn) # d ˈɔ g #\n")
+        changed = load.update_package_data(isle_file, root)
+        assert changed['reparsed'] == 2 and changed['reused'] == 3
+        assert sorted(changed['rewritten']) == ['core', 'periphery']
+        assert self.read_package(tmpdir.join('src'), 'core') == [
+            u"cat(nn,nnp) # k ˈɑ t", u"dog(nn) # d ˈɔ g"]
+        assert self.read_package(tmpdir.join('src'), 'periphery') == []
+
+    def test_incremental_edited_output(self, isle_file, tmpdir):
+        root = tmpdir.join('src')
+        load.update_package_data(isle_file, str(root))
+        root.join('islex-core', 'islex-core', 'entries.txt').write('')
+        result = load.update_package_data(isle_file, str(root))
+        assert result['rewritten'] == ['core']
+        assert result['reparsed'] == 1
+        assert self.read_package(root, 'core') == [u"cat(nn,nnp) # k ˈæ t"]
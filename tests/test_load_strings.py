@@ -8,11 +8,16 @@ test_load_strings
 Tests for `islex.tokens` module.
 """
 
+import gc
+import pickle
+
+import attr
 from six import text_type as unicode
 import pytest
 
-from islex.tokens import Word, Pos, Pron, Syllable, Morph, Phone, \
-    PosCategory, EntityCategory
+from islex.tokens import Word, LazyWord, Pos, Pron, Syllable, Morph, Phone, \
+    PosCategory, EntityCategory, ParseError, ParseErrorKind, Stress, \
+    intern_table_size, clear_intern_tables
 
 
 class TestMorphology(object):
@@ -91,15 +96,198 @@ class TestIsleWord(object):
         word = Word.from_string(self.test_str, clean=True)
         assert word.ipa == self.phones
 
-    @pytest.mark.skip("No syllable functionality yet")
     def test_stress(self):
         vin = Syllable.from_string(u'v ˌɪ n')
         assert vin.onset == [Phone(u'v'), ]
-        assert vin.coda == [Phone(u'ˌɪ'), Phone(u'n')]
+        assert vin.coda == [Phone(u'n')]
+        assert vin.rhyme == [Phone(u'ˌɪ'), Phone(u'n')]
         assert vin.is_stressed
         assert not vin.is_primary_stressed
         assert vin.nucleus == [Phone(u'ˌɪ')]
+        assert vin.stress == Stress.SECONDARY
+
+    def test_syllabic_consonant(self):
+        ven = Syllable.from_string(u'v n̩')
+        assert ven.onset == [Phone(u'v')]
+        assert ven.nucleus == [Phone(u'n̩')]
+        assert not ven.is_stressed
+
+    def test_stress_pattern(self):
+        assert Pron(sylls=self.syllables).stress_pattern == u'20222'
+        banana = Pron.from_string(u'b ə . n ˈæ . n ə')
+        assert banana.stress_pattern == u'010'
+        assert pickle.loads(pickle.dumps(banana)).stress_pattern == u'010'
 
     @classmethod
     def teardown_class(cls):
         pass
+
+
+class TestInterning(object):
+
+    def setup_method(self, method):
+        clear_intern_tables()
+
+    def test_shared_instances(self):
+        red = Word.from_string(u"red(jj) # ɹ ˈɛ d")
+        read = Word.from_string(u"read(vbd,vbn) # ɹ ˈɛ d")
+        assert red.prons[0] == read.prons[0]
+        assert red.prons[0].sylls[0] is read.prons[0].sylls[0]
+        led = Word.from_string(u"led(vbd) # l ˈɛ d")
+        assert led.prons[0].sylls[0].phones[1] is \
+            red.prons[0].sylls[0].phones[1]
+
+    def test_table_size(self):
+        words = [Word.from_string(u"record(nn) # ɹ ˈɛ . k ɚ d"),
+                 Word.from_string(u"record(vb) # ɹ ɪ . k ˈɔ ɹ d")]
+        size = intern_table_size()
+        assert (size['phones'], size['syllables']) == (7, 4)
+        assert len(words) == 2
+
+    def test_released_with_words(self):
+        words = [Word.from_string(u"record(nn) # ɹ ˈɛ . k ɚ d")]
+        assert intern_table_size()['syllables'] == 2
+        del words
+        gc.collect()
+        size = intern_table_size()
+        assert (size['phones'], size['syllables']) == (0, 0)
+
+    def test_shared_pos_tuples(self):
+        walks = Word.from_string_fast(u"walks(+walk+s,nns,vbz) # w ˈɔ k s")
+        talks = Word.from_string_fast(u"talks(+talk+s,nns,vbz) # t ˈɔ k s")
+        assert walks.pos is talks.pos
+        assert intern_table_size()['pos_tuples'] == 1
+
+    def test_clean_shares_cleaned(self):
+        a = Pron.from_string(u"s ˌɛ̃", clean=True)
+        b = Pron.from_string(u"s ˌɛ")
+        assert a.sylls[0] is b.sylls[0]
+
+
+class TestValueSemantics(object):
+    test_str = TestMorphology.test_str
+
+    def test_hashable(self):
+        w = Word.from_string(self.test_str)
+        again = Word.from_string(self.test_str)
+        assert hash(w) == hash(again)
+        assert len({w, again}) == 1
+        index = {w.prons[0]: w}
+        assert index[again.prons[0]] == w
+
+    def test_frozen(self):
+        w = Word.from_string(self.test_str)
+        with pytest.raises(attr.exceptions.FrozenInstanceError):
+            w.ortho = u"other"
+        assert not hasattr(w, '__dict__')
+
+    def test_pickle(self):
+        w = Word.from_string(self.test_str)
+        restored = pickle.loads(pickle.dumps(w))
+        assert restored == w
+        assert hash(restored) == hash(w)
+
+
+class TestFastParser(object):
+    lines = [TestMorphology.test_str, TestIsleWord.test_str,
+             TestIsleWord.cleaned_str, u"foo() # f  ˈu #",
+             u"fooed(+foo+ed,vbd) # f  ˈu d #",
+             u"the(cd,dt,jj) # ð ə # ð i",
+             u"abacus(nn_0.75,root:abacus) # ˈæ . b ə . k ə s"]
+
+    @pytest.mark.parametrize('clean', [False, True])
+    def test_identical(self, clean):
+        for ln in self.lines:
+            try:
+                expected = Word.from_string(ln, clean=clean)
+            except ValueError:
+                with pytest.raises(ValueError):
+                    Word.from_string_fast(ln, clean=clean)
+                continue
+            assert Word.from_string_fast(ln, clean=clean) == expected
+
+    def test_intern(self):
+        ln = TestMorphology.test_str
+        a = Word.from_string_fast(ln, intern=False)
+        b = Word.from_string_fast(ln, intern=False)
+        assert a == b == Word.from_string(ln)
+        assert a.prons[0].sylls[0] is not b.prons[0].sylls[0]
+        c = Word.from_string_fast(ln)
+        assert Word.from_string_fast(ln).prons[0].sylls[0] is \
+            c.prons[0].sylls[0]
+
+    def test_memoized_tags(self):
+        a = Word.from_string_fast(u"red(jj,nn) # ɹ ˈɛ d")
+        b = Word.from_string_fast(u"blue(jj,nn) # b l ˈu")
+        assert a.pos[0] is b.pos[0]
+        assert a.pos[1] is b.pos[1]
+
+    def test_morphs_not_memoized(self):
+        clear_intern_tables()
+        for stem in (u'walk', u'talk', u'balk'):
+            Word.from_string_fast(u"%ss(+%s+s,nns,vbz) # w ˈɔ k s"
+                                  % (stem, stem))
+        assert intern_table_size()['tags'] == 2
+        assert intern_table_size()['pos_tuples'] == 1
+
+    @pytest.mark.parametrize('bad', [u"foo(nn # f ˈu", u"(nn) # f ˈu",
+                                     u"foo(nn)", u"foo(zzz) # f ˈu",
+                                     u"foo(nn) bar # f ˈu"])
+    def test_errors(self, bad):
+        with pytest.raises(ValueError):
+            Word.from_string(bad)
+        with pytest.raises(ValueError):
+            Word.from_string_fast(bad)
+
+
+class TestLazyWord(object):
+    test_str = TestMorphology.test_str
+
+    def test_prons_deferred(self):
+        w = LazyWord.from_string(self.test_str)
+        assert w.ortho == u"individually"
+        assert w.morphs[0] == Morph(emes=("individual", "ly"))
+        assert w._prons is None
+        assert len(w.prons) == 1
+        assert w._prons is not None
+
+    def test_equals_word(self):
+        lazy = LazyWord.from_string(self.test_str)
+        word = Word.from_string(self.test_str)
+        assert lazy == word
+        assert word == lazy
+        assert hash(lazy) == hash(word)
+        assert lazy.ipa == word.ipa
+        assert lazy.to_string() == self.test_str
+
+    def test_materialized_once(self):
+        lazy = LazyWord.from_string(self.test_str)
+        word = lazy.materialize()
+        assert lazy.materialize() is word
+        assert lazy == word and hash(lazy) == hash(word)
+        assert lazy.materialize() is word
+
+    def test_bad_tags_fail_eagerly(self):
+        with pytest.raises(ValueError):
+            LazyWord.from_string(u"foo(zzz) # f ˈu")
+
+    def test_pickle(self):
+        lazy = LazyWord.from_string(self.test_str)
+        restored = pickle.loads(pickle.dumps(lazy))
+        assert restored == lazy
+
+
+class TestParseError(object):
+
+    def test_kinds(self):
+        with pytest.raises(ParseError) as e:
+            Word.from_string_fast(u"cat nn # k ˈæ t")
+        assert e.value.kind == ParseErrorKind.BAD_ORTHO
+        with pytest.raises(ValueError):
+            Word.from_string(u"cat(zz) # k ˈæ t")
+
+    def test_pickle(self):
+        e = ParseError(ParseErrorKind.TOO_FEW_SEGMENTS, u"too short")
+        again = pickle.loads(pickle.dumps(e))
+        assert again.kind == e.kind
+        assert str(again) == u"too short"
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_nearest
+----------------------------------
+
+Tests for `islex.nearest` module.
+"""
+
+import pytest
+
+from islex.load import pron_neighbors
+from islex.nearest import edit_distance
+
+from tests import sample_data
+
+
+@pytest.mark.parametrize('a,b,d', [
+    ((), (), 0), ((1, 2, 3), (), 3), ((1, 2, 3), (1, 2, 3), 0),
+    ((1, 2, 3), (1, 3), 1), ((1, 2, 3), (3, 2, 1), 2),
+    ("kitten", "sitting", 3)])
+def test_edit_distance(a, b, d):
+    assert edit_distance(a, b) == d
+    assert edit_distance(b, a) == d
+
+
+class TestPronNeighbors(object):
+    queries = [u"k ˈæ t s", u"f ˈoʊ . t ə", u"s t ɹ ˈi", u"ʒ ʒ ʒ",
+               u"ð ə", u""]
+
+    def test_exact(self):
+        index = pron_neighbors(sample_data)
+        d, word, pron = index.nearest(u"h ˈæ t", k=1)[0]
+        assert (d, word.ortho, pron.to_string()) == (0, u"hat", u"h ˈæ t")
+
+    def test_distances(self):
+        index = pron_neighbors(sample_data)
+        results = index.nearest(u"k ˈæ t s", k=4)
+        assert [d for d, _, _ in results] == [1, 2, 2, 2]
+        assert results[0][1].ortho == u"cat"
+
+    @pytest.mark.parametrize('k', [1, 3, 10, 100])
+    def test_matches_scan(self, k):
+        index = pron_neighbors(sample_data)
+        for q in self.queries:
+            assert index.nearest(q, k=k) == index.scan(q, k=k)
+            assert index.nearest(q, k=k, max_distance=2) == \
+                index.scan(q, k=k, max_distance=2)
+
+    def test_ignore_stress(self):
+        index = pron_neighbors(sample_data, stress=False)
+        d, word, _ = index.nearest(u"h æ t", k=1)[0]
+        assert (d, word.ortho) == (0, u"hat")
+
+    def test_empty_k(self):
+        assert pron_neighbors(sample_data).nearest(u"h ˈæ t", k=0) == []
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_writer
+----------------------------------
+
+Tests for `islex.writer` module.
+"""
+
+import io
+import json
+
+import attr
+import pytest
+
+from islex.load import stream_from_fh
+from islex.tokens import Word, LazyWord
+from islex import writer
+from islex.writer import format_words, write_words
+
+from tests import sample_data
+
+
+@pytest.fixture(scope='module')
+def words():
+    return list(sample_data.entries_stream())
+
+
+class TestWriter(object):
+
+    def test_isle_matches_to_string(self, words):
+        lines = list(format_words(words))
+        assert lines == [w.to_string() + u'\n' for w in words]
+
+    def test_isle_round_trip(self, words):
+        fh = io.StringIO()
+        assert write_words(words, fh, batch_words=7) == len(words)
+        data = fh.getvalue().encode('utf-8').splitlines(True)
+        assert list(stream_from_fh(data)) == words
+
+    def test_reference_parser_words(self):
+        w = Word.from_string(u"007(+abbreviation,nnp_person) "
+                             u"# d ˌʌ . b ə l # s ˈɛ . v ə n")
+        assert list(format_words([w, w])) == [w.to_string() + u'\n'] * 2
+
+    def test_lazy_words(self, words):
+        lazy = [LazyWord.from_string(w.to_string()) for w in words]
+        assert list(format_words(lazy)) == list(format_words(words))
+
+    def test_jsonl(self, words):
+        records = [json.loads(ln) for ln in format_words(words, 'jsonl')]
+        assert len(records) == len(words)
+        individually = [r for r in records if r['ortho'] == u'individually']
+        assert len(individually) == 3
+        assert individually[0] == {
+            u'ortho': u'individually',
+            u'pos': [u'jj', u'rb'],
+            u'morphs': [u'+individual+ly', u'+individual+y'],
+            u'prons': [u'ˌɪ n . d ə . v ˈɪ . dʒ u . ə . l i']}
+
+    def test_jsonl_escapes_prons(self):
+        w = Word.from_string(u'x(nn) # a"b c')
+        record = json.loads(next(format_words([w], 'jsonl')))
+        assert record[u'prons'] == [u'a"b c']
+
+    def test_no_prons(self, words):
+        w = attr.evolve(words[0], prons=())
+        assert next(format_words([w])) == w.to_string() + u'\n'
+        record = json.loads(next(format_words([w], 'jsonl')))
+        assert record[u'prons'] == []
+
+    def test_memo_bounded_without_interning(self, words, monkeypatch):
+        monkeypatch.setattr(writer, '_MAX_MEMO', 20)
+        copies = [Word.from_string(w.to_string(), intern=False)
+                  for w in words * 3]
+        memo = writer._Memo()
+        lines = list(writer._isle_lines(copies, memo))
+        assert lines == [w.to_string() + u'\n' for w in copies]
+        assert len(memo._keep) < 40
+        assert len(memo._pos_values) == len(set(w.pos for w in words))
+
+    def test_tsv(self, words):
+        rows = [ln.rstrip(u'\n').split(u'\t')
+                for ln in format_words(words, 'tsv')]
+        assert all(len(row) == 3 for row in rows)
+        w, row = next((w, row) for w, row in zip(words, rows)
+                      if row[0] == u'paris')
+        assert row[1] == u','.join(p.to_string() for p in w.pos)
+        assert row[2].split() == list(w.ipa)
+
+    def test_unknown_format(self, words):
+        with pytest.raises(ValueError):
+            format_words(words, 'xml')